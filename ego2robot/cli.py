@@ -12,7 +12,9 @@ def cli():
 @cli.command()
 @click.option('--config', default='config/default.yaml', help='Config file path')
 @click.option('--max-videos', default=None, type=int, help='Max videos to process')
-def convert(config, max_videos):
+@click.option('--rank', default=None, type=int, envvar='RANK', help='This process\'s shard slice')
+@click.option('--world-size', default=None, type=int, envvar='WORLD_SIZE', help='Number of processes splitting the run')
+def convert(config, max_videos, rank, world_size):
     """Convert egocentric video to LeRobot format."""
     from ego2robot.data.sampler import EgocentricSampler
     from ego2robot.data.clips import ClipExtractor
@@ -25,29 +27,68 @@ def convert(config, max_videos):
     
     if max_videos:
         cfg['data']['max_videos'] = max_videos
+    if rank is not None:
+        cfg['data']['rank'] = rank
+    if world_size is not None:
+        cfg['data']['world_size'] = world_size
     
     click.echo(f"Processing {cfg['data']['max_videos']} videos...")
     
     # Run pipeline
     sampler = EgocentricSampler(cfg)
-    extractor = ClipExtractor(cfg)
+    parallel = cfg['processing'].get('num_workers', 0) > 0
+    if parallel:
+        from ego2robot.data.parallel import ParallelClipExtractor
+        extractor = ParallelClipExtractor(cfg)
+    else:
+        extractor = ClipExtractor(cfg)
     quality_filter = QualityFilter(cfg)
     storage = ClipStorage(cfg)
     
-    all_clips = []
-    for i, video in enumerate(sampler.filter_videos()):
-        click.echo(f"Processing video {i+1}...")
-        clips = extractor.extract_clips(video['video_bytes'], video['metadata'])
-        all_clips.extend(clips)
+    def announce(videos):
+        for i, video in enumerate(videos):
+            click.echo(f"Processing video {i+1}...")
+            yield video
     
-    click.echo(f"Filtering {len(all_clips)} clips...")
-    filtered = quality_filter.filter_clips(all_clips)
+    # Stream extract -> filter -> save one clip at a time so memory stays flat
+    try:
+        clips = extractor.extract_videos(announce(sampler.filter_videos()))
+        
+        # Rejected clips hand their buffers straight back; saved ones once written
+        for clip in quality_filter.iter_filter(clips, on_reject=extractor.release_clip):
+            storage.save_clip(clip, on_written=extractor.release_clip)
+    finally:
+        try:
+            # Drain pending writes before their frame buffers are freed
+            storage.close()
+        finally:
+            if parallel:
+                extractor.close()
+            quality_filter.close()
     
-    click.echo(f"Saving {len(filtered)} clips...")
-    storage.save_clips(filtered)
+    click.echo("✓ Quality stages:")
+    click.echo(quality_filter.report())
+    if cfg['clips'].get('segmentation', 'fixed') == 'activity':
+        click.echo(f"✓ {extractor.segmentation_report()}")
+    if cfg['clips'].get('early_reject') or extractor.stats['prescreened']:
+        click.echo(f"✓ {extractor.rejection_report()}")
     
     click.echo("✓ Done!")
 
+@cli.command()
+@click.option('--config', default='config/default.yaml', help='Config file path')
+@click.option('--output-dir', default=None, help='Directory holding per-rank manifests')
+def merge(config, output_dir):
+    """Merge per-rank clip manifests from a distributed convert."""
+    from ego2robot.data.storage import merge_manifests
+    
+    if output_dir is None:
+        with open(config) as f:
+            cfg = yaml.safe_load(f)
+        output_dir = cfg['output']['local_dir']
+    
+    merge_manifests(output_dir)
+
 @cli.command()
 @click.argument('dataset_path')
 def validate(dataset_path):
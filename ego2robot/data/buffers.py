@@ -0,0 +1,48 @@
+"""
+Reusable preallocated clip buffers.
+"""
+import threading
+import weakref
+
+import numpy as np
+
+
+class ClipBufferPool:
+    """
+    Pool of (T, H, W, 3) uint8 buffers that clip frames are decoded into.
+    Clips hand their buffer back with release() once downstream is done;
+    clips that are never released are simply garbage collected.
+    """
+
+    def __init__(self, max_free=8):
+        self.max_free = max_free
+        self._free = {}  # shape -> [buffers]
+        self._out = weakref.WeakValueDictionary()  # id -> buffers handed out
+        self._lock = threading.Lock()  # releases may come from writer threads
+
+    def acquire(self, shape):
+        """A buffer of this shape, reused if one is free."""
+        shape = tuple(shape)
+
+        with self._lock:
+            free = self._free.get(shape)
+            buffer = free.pop() if free else None
+
+            if buffer is None:
+                buffer = np.empty(shape, dtype=np.uint8)
+            self._out[id(buffer)] = buffer
+
+        return buffer
+
+    def release(self, frames):
+        """Return a buffer (or a view of one, e.g. buffer[:n]) to the pool."""
+        buffer = frames if frames.base is None else frames.base
+
+        with self._lock:
+            if self._out.get(id(buffer)) is not buffer:
+                return
+            del self._out[id(buffer)]
+
+            free = self._free.setdefault(buffer.shape, [])
+            if len(free) < self.max_free:
+                free.append(buffer)
@@ -0,0 +1,107 @@
+"""
+Shard discovery and work assignment for Egocentric-10K.
+"""
+import json
+import os
+import re
+from huggingface_hub import HfApi
+
+# factory_001/workers/worker_001/factory001_worker001_part00.tar
+SHARD_PATTERN = re.compile(
+    r'^(factory_(\d+))/workers/(worker_(\d+))/factory\d+_worker\d+_part(\d+)\.tar$'
+)
+
+
+def parse_shard(filename):
+    """Return factory/worker/part for a shard path, or None if it isn't one."""
+    match = SHARD_PATTERN.match(filename)
+    if match is None:
+        return None
+
+    return {
+        'factory': match.group(1),
+        'worker': match.group(3),
+        'part': int(match.group(5)),
+        'sort_key': (int(match.group(2)), int(match.group(4)), int(match.group(5)))
+    }
+
+
+class ShardCatalog:
+    """
+    Every factory/worker/part shard in the dataset, listed once and cached.
+    Each process takes a deterministic slice by rank so many machines can
+    split one run with no coordinator.
+    """
+
+    def __init__(self, config, cache_dir="./data/cache"):
+        self.config = config
+        self.cache_dir = cache_dir
+
+    def list_shards(self, refresh=False):
+        """All shard filenames, sorted by factory, worker and part."""
+        data_cfg = self.config['data']
+        local_root = data_cfg.get('local_root')
+
+        if local_root:
+            files = self._list_local(local_root)
+        else:
+            files = self._list_hub(data_cfg['dataset_name'], refresh)
+
+        factories = data_cfg.get('factories')
+        workers = data_cfg.get('workers')
+
+        shards = []
+        for filename in files:
+            info = parse_shard(filename)
+            if info is None:
+                continue
+            if factories and info['factory'] not in factories:
+                continue
+            if workers and info['worker'] not in workers:
+                continue
+            shards.append((info['sort_key'], filename))
+
+        return [filename for _, filename in sorted(shards)]
+
+    def assign(self, rank=0, world_size=1):
+        """This rank's shards: every world_size-th shard starting at rank."""
+        if not 0 <= rank < world_size:
+            raise ValueError(f"rank {rank} out of range for world_size {world_size}")
+
+        # Round-robin so every rank gets a mix of factories
+        return self.list_shards()[rank::world_size]
+
+    def _list_hub(self, repo_id, refresh):
+        """List repo files from the hub, cached after the first call."""
+        cache_path = os.path.join(
+            self.cache_dir, f"shard_catalog_{repo_id.replace('/', '__')}.json"
+        )
+
+        if not refresh and os.path.exists(cache_path):
+            with open(cache_path) as f:
+                return json.load(f)
+
+        print(f"Listing shards in {repo_id}...")
+        files = [
+            f for f in HfApi().list_repo_files(repo_id, repo_type="dataset")
+            if f.endswith('.tar')
+        ]
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(files, f)
+        os.replace(tmp_path, cache_path)
+
+        print(f"✓ Cached {len(files)} shard names to {cache_path}")
+        return files
+
+    def _list_local(self, local_root):
+        """List tar files under a local mirror of the hub layout."""
+        files = []
+        for dirpath, _, filenames in os.walk(local_root):
+            for name in filenames:
+                if name.endswith('.tar'):
+                    rel = os.path.relpath(os.path.join(dirpath, name), local_root)
+                    files.append(rel.replace(os.sep, '/'))
+        return files
@@ -2,95 +2,400 @@
 Extract clips from long videos.
 """
 import cv2
-import numpy as np
-from typing import List, Dict
-import tempfile
-import os
+from typing import List, Dict, Iterator
+from ego2robot.data.video_io import open_reader
+from ego2robot.data.buffers import ClipBufferPool
+from ego2robot.data.quality import motion_threshold
+from ego2robot.data.segmentation import ActivitySegmenter
+from ego2robot.vision.motion import MotionVectorScorer, motion_scorer_name
 
 class ClipExtractor:
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, buffer_pool=None):
         self.config = config
+        self.buffer_pool = buffer_pool or ClipBufferPool(
+            max_free=config['processing'].get('buffer_pool_size', 8)
+        )
         
-    def extract_clips(self, video_bytes: bytes, metadata: dict) -> List[Dict]:
+        # Drop windows whose motion, tracked while decoding, can't pass the
+        # filter's motion stage (nothing to judge against without one)
+        self.min_motion = motion_threshold(config)
+        
+        # motion.scorer 'mv': score every window from codec motion vectors in
+        # one pass and drop slow ones before decoding any pixels
+        self.vector_scorer = None
+        if motion_scorer_name(config) == 'mv':
+            self.vector_scorer = MotionVectorScorer(config)
+        
+        # The pixel probe measures in the pixel scorer's unit only
+        self.early_reject = (config['clips'].get('early_reject', False) and self.min_motion is not None
+                             and self.vector_scorer is None)
+        self.stats = empty_stats()
+        
+        # Place windows in active spans found by a low-res scan, not on a grid
+        self.segmenter = None
+        if config['clips'].get('segmentation', 'fixed') == 'activity':
+            self.segmenter = ActivitySegmenter(config)
+        
+    def extract_clips(self, video_bytes, metadata: dict) -> List[Dict]:
         """
         Extract clips from a video.
+        video_bytes: raw bytes or a ByteRange into a cached shard;
+        decoded in place, never copied to a temp file.
         Returns list of clips with metadata.
         """
-        # Write video bytes to temp file
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
-            f.write(video_bytes)
-            temp_path = f.name
-            
-        try:
-            clips = self._process_video(temp_path, metadata)
-        finally:
-            os.unlink(temp_path)
+        return list(self.iter_clips(video_bytes, metadata))
+    
+    def iter_clips(self, video_bytes, metadata: dict) -> Iterator[Dict]:
+        """Yield a video's clips one at a time, as each window is decoded."""
+        size = self.config['processing']['target_resolution']
+        decoder = self.config['processing'].get('decoder', 'opencv')
+        
+        with open_reader(video_bytes, size, decoder) as reader:
+            if reader is None:
+                print(f"Failed to open video")
+                return
             
-        return clips
+            yield from self._process_video(reader, metadata, video_bytes)
     
-    def _process_video(self, video_path: str, metadata: dict) -> List[Dict]:
-        """Process video file and extract clips."""
-        cap = cv2.VideoCapture(video_path)
-
-        if not cap.isOpened():
-            print(f"Failed to open video")
-            return []
-                
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    def extract_videos(self, videos):
+        """Yield clips from sampler videos, one clip at a time."""
+        for video in videos:
+            yield from self.iter_clips(video['video_bytes'], video['metadata'])
+    
+    def rejection_report(self) -> str:
+        return rejection_report(self.stats)
+    
+    def segmentation_report(self) -> str:
+        return segmentation_report(self.stats)
+    
+    def release_clip(self, clip: Dict):
+        """Hand a clip's frame buffer back for reuse once it has been saved or dropped."""
+        self.buffer_pool.release(clip['frames'])
+    
+    def _buffer_shape(self, duration, fps):
+        """(T, H, W, 3) for one clip: target_duration * target_fps frames at this video's skip."""
+        frame_skip = max(1, int(fps / self.config['processing']['target_fps']))
+        num_frames = int(duration * fps)
+        h, w = self.config['processing']['target_resolution']
+        return (-(-num_frames // frame_skip), h, w, 3)
+    
+    def _process_video(self, reader, metadata: dict, video_bytes=None) -> Iterator[Dict]:
+        """Yield clips from an opened video reader."""
+        fps = reader.fps
+        total_frames = reader.frame_count
         duration = total_frames / fps
         
         target_duration = self.config['clips']['target_duration']
-        stride = self.config['clips']['stride']
+        start_times = self._window_starts(reader, duration)
         
-        clips = []
-        start_time = 0
+        vector_motion = None
+        if self.vector_scorer is not None and video_bytes is not None and start_times:
+            scores = self.vector_scorer.window_scores(video_bytes, start_times, target_duration)
+            vector_motion = dict(zip(start_times, scores.tolist()))
+            if self.min_motion is not None:
+                kept = [t for t in start_times if vector_motion[t] >= self.min_motion]
+                self.stats['prescreened'] += len(start_times) - len(kept)
+                start_times = kept
         
-        while start_time + target_duration <= duration:
-            clip_data = self._extract_single_clip(
-                cap, 
+        if self.config['processing'].get('decode_mode', 'seek') == 'sequential':
+            clips = self._process_video_sequential(reader, start_times, fps, metadata)
+        else:
+            clips = self._process_windows(reader, start_times, fps, metadata)
+        
+        for clip in clips:
+            if vector_motion is not None:
+                # The motion stage judges the vector score, not the pixels
+                clip['motion_score'] = vector_motion[clip['start_time']]
+            yield clip
+    
+    def _process_windows(self, reader, start_times, fps, metadata):
+        """Seek to and decode each window in turn."""
+        target_duration = self.config['clips']['target_duration']
+        
+        for start_time in start_times:
+            clip_data, motion = self._extract_single_clip(
+                reader, 
                 start_time, 
                 target_duration, 
                 fps
             )
             
             if clip_data is not None:
-                clips.append({
+                clip = {
                     'frames': clip_data,
                     'start_time': start_time,
                     'duration': target_duration,
                     'source_metadata': metadata
-                })
-            
+                }
+                if motion is not None:
+                    # Same value MotionScorer would compute; saves rescoring
+                    clip['motion_score'] = motion
+                yield clip
+    
+    def _window_starts(self, reader, duration):
+        """Clip start times: inside active spans, or on a fixed stride grid."""
+        if self.segmenter is not None:
+            start_times, active_seconds = self.segmenter.segment(reader, duration)
+            self.stats['scanned_seconds'] += duration
+            self.stats['active_seconds'] += active_seconds
+            return start_times
+        
+        target_duration = self.config['clips']['target_duration']
+        stride = self.config['clips']['stride']
+        
+        start_times = []
+        start_time = 0
+        
+        while start_time + target_duration <= duration:
+            start_times.append(start_time)
             start_time += stride
         
-        cap.release()
-        return clips
+        return start_times
     
-    def _extract_single_clip(self, cap, start_time, duration, fps):
-        """Extract single clip with downsampling."""
+    def _process_video_sequential(self, reader, start_times, fps, metadata):
+        """
+        Decode the video once, front to back, handing each kept frame to
+        every window it belongs to. Overlapping windows hold references to
+        the same resized frame instead of decoding and storing it again.
+        """
+        target_duration = self.config['clips']['target_duration']
+        target_fps = self.config['processing']['target_fps']
+        
+        frame_skip = max(1, int(fps / target_fps))
+        num_frames = int(target_duration * fps)
+        
+        windows = [(start_time, int(start_time * fps)) for start_time in start_times]
+        if not windows:
+            return
+        first_frame = windows[0][1]
+        last_frame = windows[-1][1] + num_frames
+        
+        active = []  # _Window, in start order
+        next_window = 0
+        
+        # Nothing before the first window is needed
+        reader.seek(first_frame)
+        
+        for frame_idx in range(first_frame, last_frame):
+            # Advance the decoder; pixels are only converted if a window wants them
+            if not reader.grab():
+                break
+            
+            while next_window < len(windows) and windows[next_window][1] <= frame_idx:
+                start_time, start_frame = windows[next_window]
+                active.append(_Window(start_time, start_frame, self._new_probe(num_frames, frame_skip)))
+                self.stats['windows'] += 1
+                next_window += 1
+            
+            frame_small = None
+            frame_gray = None
+            for window in active:
+                # Same sampling phase as seeking to start_frame
+                if (frame_idx - window.start_frame) % frame_skip != 0:
+                    continue
+                
+                if frame_small is None:
+                    frame_small = reader.retrieve()
+                    if frame_small is None:
+                        break
+                
+                if window.probe is not None and window.probe.wants(len(window.frames)):
+                    if frame_gray is None:
+                        frame_gray = _MotionProbe.prepare(frame_small)
+                    window.probe.add(frame_gray)
+                
+                window.frames.append(frame_small)
+            
+            # Stop collecting for windows that clearly won't pass
+            for window in [w for w in active if w.probe is not None and w.probe.hopeless()]:
+                active.remove(window)
+                self.stats['abandoned'] += 1
+            
+            # Windows all have the same length, so they finish in start order
+            while active and frame_idx - active[0].start_frame >= num_frames - 1:
+                clip = self._finish_window(active.pop(0), target_duration, metadata, fps)
+                if clip is not None:
+                    yield clip
+        
+        # Video ended early: keep whatever the open windows collected
+        for window in active:
+            clip = self._finish_window(window, target_duration, metadata, fps)
+            if clip is not None:
+                yield clip
+    
+    def _finish_window(self, window, duration, metadata, fps):
+        """Copy a sequential-mode window's shared frames into its clip buffer."""
+        frames = window.frames
+        
+        if len(frames) < 10:  # Need at least 10 frames
+            return None
+        
+        if window.probe is not None and not window.probe.passes():
+            # Never materialized, never seen by MediaPipe
+            self.stats['rejected'] += 1
+            return None
+        
+        buffer = self.buffer_pool.acquire(self._buffer_shape(duration, fps))
+        clip_frames = buffer[:len(frames)]
+        for i, frame in enumerate(frames):
+            clip_frames[i] = frame
+        
+        clip = {
+            'frames': clip_frames,
+            'start_time': window.start_time,
+            'duration': duration,
+            'source_metadata': metadata
+        }
+        if window.probe is not None:
+            clip['motion_score'] = window.probe.score()
+        return clip
+    
+    def _new_probe(self, num_frames, frame_skip):
+        """Motion probe for a window, or None when early rejection is off."""
+        if not self.early_reject:
+            return None
+        return _MotionProbe(num_kept=-(-num_frames // frame_skip), min_motion=self.min_motion)
+    
+    def _extract_single_clip(self, reader, start_time, duration, fps):
+        """
+        Extract single clip with downsampling, straight into a pooled buffer.
+        Returns (frames, motion score or None); frames is None if dropped.
+        """
         start_frame = int(start_time * fps)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        reader.seek(start_frame)
         
-        frames = []
         target_fps = self.config['processing']['target_fps']
         frame_skip = max(1, int(fps / target_fps))
         
         num_frames = int(duration * fps)
         
+        buffer = self.buffer_pool.acquire(self._buffer_shape(duration, fps))
+        probe = self._new_probe(num_frames, frame_skip)
+        self.stats['windows'] += 1
+        count = 0
+        
         for i in range(num_frames):
-            ret, frame = cap.read()
-            if not ret:
+            # Dropped frames are only grabbed, never converted
+            if not reader.grab():
                 break
             
-            # Only keep every Nth frame
+            # Only keep every Nth frame, written at target resolution into its slot
             if i % frame_skip == 0:
-                # Downsample resolution immediately
-                h, w = self.config['processing']['target_resolution']
-                frame_small = cv2.resize(frame, (w, h))
-                frames.append(frame_small)
+                if reader.retrieve(out=buffer[count]) is None:
+                    break
+                
+                if probe is not None:
+                    if probe.wants(count):
+                        probe.add(_MotionProbe.prepare(buffer[count]))
+                    if probe.hopeless():
+                        # Skip the rest of this window's decode
+                        self.stats['abandoned'] += 1
+                        self.stats['frames_skipped'] += num_frames - i - 1
+                        self.buffer_pool.release(buffer)
+                        return None, None
+                
+                count += 1
         
-        if len(frames) < 10:  # Need at least 10 frames
-            return None
+        if count < 10:  # Need at least 10 frames
+            self.buffer_pool.release(buffer)
+            return None, None
+        
+        if probe is None:
+            return buffer[:count], None
+        
+        if not probe.passes():
+            self.stats['rejected'] += 1
+            self.buffer_pool.release(buffer)
+            return None, None
             
-        return np.array(frames, dtype=np.uint8)
\ No newline at end of file
+        return buffer[:count], probe.score()
+
+
+def empty_stats():
+    """Counters an extractor keeps across videos."""
+    return {
+        'windows': 0,            # windows started
+        'prescreened': 0,        # dropped on motion-vector score before any decode
+        'abandoned': 0,          # given up mid-window
+        'rejected': 0,           # decoded but below the motion threshold, never materialized
+        'frames_skipped': 0,     # source frames never decoded thanks to abandoning
+        'scanned_seconds': 0.0,  # video covered by activity scans
+        'active_seconds': 0.0,   # of which found active
+    }
+
+
+def rejection_report(stats):
+    """One-line summary of what early rejection saved."""
+    dropped = stats['abandoned'] + stats['rejected']
+    report = (f"Early rejection: {dropped}/{stats['windows']} windows dropped "
+              f"({stats['abandoned']} mid-window, {stats['rejected']} at end), "
+              f"{stats['frames_skipped']} source frames never decoded")
+    if stats['prescreened']:
+        report += f"; {stats['prescreened']} more dropped on motion vectors before decode"
+    return report
+
+
+def segmentation_report(stats):
+    """One-line summary of activity segmentation."""
+    scanned = stats['scanned_seconds']
+    share = stats['active_seconds'] / scanned if scanned else 0.0
+    return (f"Activity segmentation: {stats['active_seconds']:.0f}s of {scanned:.0f}s active "
+            f"({share:.0%}), {stats['windows']} windows placed")
+
+
+class _Window:
+    """A sequential-mode clip window being filled."""
+    
+    __slots__ = ('start_time', 'start_frame', 'frames', 'probe')
+    
+    def __init__(self, start_time, start_frame, probe=None):
+        self.start_time = start_time
+        self.start_frame = start_frame
+        self.frames = []
+        self.probe = probe
+
+
+class _MotionProbe:
+    """
+    Running MotionScorer.score_clip for a window being decoded:
+    every 2nd kept frame at 160x90 grayscale, mean absolute difference.
+    """
+    
+    def __init__(self, num_kept, min_motion):
+        self.min_motion = min_motion
+        # Differences MotionScorer takes over a full window (frames[::2])
+        self.max_diffs = max(1, (num_kept + 1) // 2 - 1)
+        self.prev = None
+        self.total = 0.0
+        self.diffs = 0
+    
+    @staticmethod
+    def prepare(frame):
+        return cv2.cvtColor(cv2.resize(frame, (160, 90)), cv2.COLOR_BGR2GRAY)
+    
+    def wants(self, index):
+        """MotionScorer uses frames[::2]."""
+        return index % 2 == 0
+    
+    def add(self, gray):
+        if self.prev is not None:
+            self.total += cv2.absdiff(self.prev, gray).mean()
+            self.diffs += 1
+        self.prev = gray
+    
+    def score(self):
+        return self.total / self.diffs / 255.0 if self.diffs else 0.0
+    
+    def hopeless(self):
+        """
+        Can't pass however the window ends: even if every remaining
+        difference were the largest possible (255), the full-window score
+        stays below min_motion. Stopping earlier only scores fewer of those
+        differences, so it can't do better either.
+        """
+        remaining = max(self.max_diffs - self.diffs, 0)
+        best = (self.total + 255.0 * remaining) / max(self.max_diffs, self.diffs) / 255.0
+        return self.diffs > 0 and best < self.min_motion
+    
+    def passes(self):
+        return self.score() >= self.min_motion
@@ -0,0 +1,260 @@
+"""
+Clip manifest in SQLite (WAL mode): one row per clip, committed as each
+clip is saved, with per-field updates for later pipeline stages.
+"""
+import json
+import os
+import sqlite3
+
+# Record fields exposed as indexed (virtual, generated) columns for queries
+QUERY_COLUMNS = {
+    'motion': "json_extract(record, '$.quality_scores.motion')",
+    'hand_visibility': "json_extract(record, '$.quality_scores.hand_visibility')",
+    'quality': "motion + hand_visibility",
+    'skill_cluster_id': "json_extract(record, '$.skill_cluster_id')",
+    'skill_cluster_name': "json_extract(record, '$.skill_cluster_name')",
+    'top_label': "json_extract(record, '$.zero_shot_labels.top_label')",
+    'top_confidence': "json_extract(record, '$.zero_shot_labels.top_confidence')",
+    'factory_id': "json_extract(record, '$.source_metadata.factory_id')",
+    'worker_id': "json_extract(record, '$.source_metadata.worker_id')",
+    'start_time': "json_extract(record, '$.start_time')",
+    'duration': "json_extract(record, '$.duration')",
+    'num_frames': "json_extract(record, '$.num_frames')",
+    'frames_path': "json_extract(record, '$.frames_path')",
+    'frames_format': "json_extract(record, '$.frames_format')",
+}
+
+FILTER_OPS = {'=', '!=', '<', '<=', '>', '>=', 'in', 'like'}
+AGGREGATES = {'count', 'avg', 'min', 'max', 'sum'}
+
+
+class ManifestStore:
+    """
+    Clip records keyed by clip_id, in save order. Every add/update is its
+    own transaction, so a crash loses at most the clip being written and
+    never leaves a half-written manifest. Readers (other stages) can query
+    while a convert run is still appending.
+
+    Fields in QUERY_COLUMNS are indexed, so query / count / aggregate
+    filter, sort and group in SQLite and only parse the records returned.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")  # wait out other writers instead of failing
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS clips ("
+            " seq INTEGER PRIMARY KEY,"
+            " clip_id TEXT UNIQUE NOT NULL,"
+            " record TEXT NOT NULL)"
+        )
+        self._add_query_columns()
+        self.conn.commit()
+
+    def _add_query_columns(self):
+        """Add any missing QUERY_COLUMNS (and their indexes) to the clips table."""
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_xinfo(clips)")}
+        for name, expression in QUERY_COLUMNS.items():
+            if name not in existing:
+                self.conn.execute(f"ALTER TABLE clips ADD COLUMN {name} GENERATED ALWAYS AS ({expression}) VIRTUAL")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS clips_{name} ON clips ({name})")
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM clips").fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.records())
+
+    def next_seq(self):
+        """Sequence number the next added clip gets (continues across runs)."""
+        return self.conn.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM clips").fetchone()[0]
+
+    def add(self, record, seq=None):
+        """Commit one clip record (must have a unique 'clip_id')."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO clips (seq, clip_id, record) VALUES (?, ?, ?)",
+                (seq, record['clip_id'], json.dumps(record)),
+            )
+
+    def get(self, clip_id):
+        row = self.conn.execute("SELECT record FROM clips WHERE clip_id = ?", (clip_id,)).fetchone()
+        if row is None:
+            raise KeyError(clip_id)
+        return json.loads(row[0])
+
+    def records(self):
+        """All records, in save order."""
+        return [json.loads(record) for record, in self.conn.execute("SELECT record FROM clips ORDER BY seq")]
+
+    def query(self, filters=None, order_by=None, limit=None, columns=None):
+        """
+        Records matching filters, using the QUERY_COLUMNS indexes.
+        filters: {column: value} or {column: (op, value)}, op one of FILTER_OPS
+        order_by: column, '-column' for descending, or a list of those
+        columns: return only these columns as dicts (records are not parsed)
+        """
+        where, params = self._where(filters)
+        selected = ", ".join(self._column(name) for name in columns) if columns else "record"
+        sql = f"SELECT {selected} FROM clips{where}{self._order(order_by)}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        rows = self.conn.execute(sql, params)
+        if columns:
+            return [dict(zip(columns, row)) for row in rows]
+        return [json.loads(record) for record, in rows]
+
+    def count(self, filters=None):
+        where, params = self._where(filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM clips{where}", params).fetchone()[0]
+
+    def aggregate(self, group_by=None, filters=None, order_by=None, **stats):
+        """
+        Per-group statistics, e.g.
+        aggregate('skill_cluster_id', avg_motion=('avg', 'motion'))
+        Every row has the group columns, 'count', and each named stat.
+        order_by may also name 'count' or a stat.
+        """
+        groups = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        selected = [self._column(name) for name in groups] + ["COUNT(*) AS count"]
+        for name, (func, column) in stats.items():
+            if func not in AGGREGATES:
+                raise ValueError(f"unknown aggregate {func!r} (use one of {sorted(AGGREGATES)})")
+            selected.append(f"{func}({self._column(column)}) AS {self._identifier(name)}")
+
+        where, params = self._where(filters)
+        sql = f"SELECT {', '.join(selected)} FROM clips{where}"
+        if groups:
+            sql += f" GROUP BY {', '.join(groups)}"
+        sql += self._order(order_by, default=None, extra=['count', *stats])
+
+        names = groups + ['count', *stats]
+        return [dict(zip(names, row)) for row in self.conn.execute(sql, params)]
+
+    def _column(self, name):
+        if name not in QUERY_COLUMNS and name not in ('clip_id', 'seq'):
+            raise ValueError(f"can't query on {name!r} (columns: clip_id, seq, {', '.join(QUERY_COLUMNS)})")
+        return name
+
+    @staticmethod
+    def _identifier(name):
+        if not name.isidentifier():
+            raise ValueError(f"invalid name {name!r}")
+        return name
+
+    def _where(self, filters):
+        """(' WHERE ...', params) for a filters dict."""
+        clauses, params = [], []
+        for name, condition in (filters or {}).items():
+            op, value = condition if isinstance(condition, tuple) else ('=', condition)
+            if op not in FILTER_OPS:
+                raise ValueError(f"unknown filter op {op!r} (use one of {sorted(FILTER_OPS)})")
+            column = self._column(name)
+
+            if op == 'in':
+                values = list(value)
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params += values
+            elif value is None:
+                clauses.append(f"{column} IS {'NOT ' if op == '!=' else ''}NULL")
+            else:
+                clauses.append(f"{column} {op.upper()} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _order(self, order_by, default='seq', extra=()):
+        """' ORDER BY ...' for a column, '-column', or a list of those (extra: allowed result names)."""
+        if not order_by:
+            return f" ORDER BY {default}" if default else ""
+        terms = []
+        for term in [order_by] if isinstance(order_by, str) else order_by:
+            name = term.lstrip('-')
+            column = self._identifier(name) if name in extra else self._column(name)
+            terms.append(f"{column} {'DESC' if term.startswith('-') else 'ASC'}")
+        return " ORDER BY " + ", ".join(terms)
+
+    def update(self, clip_id, **fields):
+        """Set top-level fields of one record in place."""
+        self.update_many([(clip_id, fields)])
+
+    def update_many(self, updates):
+        """
+        Set fields on many records in one transaction.
+        updates: iterable of (clip_id, {field: value})
+        """
+        with self.conn:
+            for clip_id, fields in updates:
+                if not fields:
+                    continue
+                assignment, params = self._set(fields)
+                cursor = self.conn.execute(f"UPDATE clips SET {assignment} WHERE clip_id = ?", params + [clip_id])
+                if cursor.rowcount == 0:
+                    raise KeyError(clip_id)
+
+    def update_where(self, filters, **fields):
+        """Set the same fields on every record matching filters; returns how many changed."""
+        if not fields:
+            return 0
+        assignment, values = self._set(fields)
+        where, params = self._where(filters)
+        with self.conn:
+            cursor = self.conn.execute(f"UPDATE clips SET {assignment}{where}", values + params)
+        return cursor.rowcount
+
+    @staticmethod
+    def _set(fields):
+        """('record = json_set(...)', params) setting top-level fields."""
+        paths, params = [], []
+        for key, value in fields.items():
+            paths.append("?, json(?)")
+            params += ['$."' + key + '"', json.dumps(value)]
+        return f"record = json_set(record, {', '.join(paths)})", params
+
+    def import_records(self, records):
+        """Add records in order, skipping clip_ids already present; returns how many were added."""
+        with self.conn:
+            seq = self.next_seq()
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO clips (seq, clip_id, record) VALUES (?, ?, ?)",
+                [(seq + i, record['clip_id'], json.dumps(record)) for i, record in enumerate(records)],
+            )
+            return self.conn.total_changes - before
+
+    def import_json(self, path):
+        """Add the records of a JSON manifest (e.g. from before ManifestStore)."""
+        with open(path) as f:
+            return self.import_records(json.load(f))
+
+    def export_json(self, path):
+        """Write all records as a JSON array (same layout as before), replacing path atomically."""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.records(), f, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+    def close(self):
+        self.conn.close()
+
+
+def open_manifest(output_dir, name='clips_manifest', create=False):
+    """
+    ManifestStore for <output_dir>/<name>.db. An empty or missing database
+    is filled from <name>.json (output dirs from before ManifestStore).
+    Without create, a dir with neither file raises FileNotFoundError
+    instead of opening an empty manifest.
+    """
+    db_path = os.path.join(output_dir, name + '.db')
+    json_path = os.path.join(output_dir, name + '.json')
+    if not create and not os.path.exists(db_path) and not os.path.exists(json_path):
+        raise FileNotFoundError(f"No manifest in {output_dir} ({name}.db or {name}.json)")
+
+    store = ManifestStore(db_path)
+    if not len(store) and os.path.exists(json_path):
+        store.import_json(json_path)
+    return store
@@ -0,0 +1,242 @@
+"""
+Decode videos on a process pool, handing clips back through shared memory.
+"""
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+from ego2robot.data.clips import ClipExtractor, empty_stats, rejection_report, segmentation_report
+
+
+class SharedClip:
+    """Name, shape and dtype of frames in a shared-memory block (cheap to pickle)."""
+
+    def __init__(self, name, shape, dtype='uint8'):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = dtype
+
+    @classmethod
+    def create(cls, shape, dtype='uint8', track=True):
+        """
+        New block sized for shape; returns (handle, shm, array over it).
+        track=False leaves cleanup to whichever process attaches to it.
+        """
+        nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        if not track:
+            _untrack(shm)
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return cls(shm.name, shape, dtype), shm, array
+
+    @classmethod
+    def from_array(cls, array):
+        """Copy an array into a new block; returns (handle, shm)."""
+        handle, shm, block = cls.create(array.shape, array.dtype.name)
+        block[...] = array
+        return handle, shm
+
+    def attach(self, track=True):
+        """
+        Map the block in this process; returns (shm, array over it).
+        track=True makes this process's resource tracker responsible for it.
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        if not track:
+            _untrack(shm)
+        return shm, np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+
+
+def _untrack(shm):
+    """Stop this process's resource tracker from unlinking the block at exit."""
+    resource_tracker.unregister(shm._name, 'shared_memory')
+
+
+def free_block(shm):
+    """Unlink a block and unmap it if nothing still points into it."""
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        shm.close()
+    except BufferError:
+        # Still referenced; unmapped once the last array goes away
+        pass
+
+
+class SharedMemoryBufferPool:
+    """
+    ClipBufferPool stand-in for pool workers: each clip buffer is its own
+    shared-memory block, so frames are decoded straight into memory the
+    parent can map. Ownership passes to the parent with detach().
+    """
+
+    def __init__(self):
+        self._blocks = {}  # id(buffer) -> (buffer, handle, shm)
+
+    def acquire(self, shape):
+        # The parent takes ownership, so the worker must not clean it up
+        handle, shm, buffer = SharedClip.create(shape, track=False)
+        self._blocks[id(buffer)] = (buffer, handle, shm)
+        return buffer
+
+    def _pop(self, frames):
+        """
+        Remove and return the block behind a buffer or a view of one
+        (buffer[:n]). Buffers are matched by identity: a buffer's own .base
+        is the shared-memory mmap, not None.
+        """
+        for candidate in (frames, frames.base):
+            block = self._blocks.get(id(candidate))
+            if block is not None and block[0] is candidate:
+                del self._blocks[id(candidate)]
+                return block
+        return None
+
+    def release(self, frames):
+        block = self._pop(frames)
+        if block is not None:
+            # unlink() unregisters the block; register it back so the
+            # tracker isn't asked to forget a block it never knew about
+            resource_tracker.register(block[2]._name, 'shared_memory')
+            free_block(block[2])
+
+    def detach(self, frames):
+        """Handle for a clip's frames (only the first len(frames) rows are used)."""
+        block = self._pop(frames)
+        if block is None:
+            raise KeyError("frames are not from this pool")
+        _, handle, shm = block
+        return SharedClip(handle.name, frames.shape), shm
+
+
+_worker_extractor = None
+
+
+def _init_worker(config):
+    global _worker_extractor
+    cv2.setNumThreads(1)  # one decode thread per process
+    _worker_extractor = ClipExtractor(config, buffer_pool=SharedMemoryBufferPool())
+
+
+def _extract_in_worker(video_bytes, metadata):
+    """
+    Extract one video's clips; return (SharedClip, clip fields) pairs and
+    this video's early-rejection counts.
+    """
+    stats = _worker_extractor.stats
+    before = dict(stats)
+    clips = _worker_extractor.extract_clips(video_bytes, metadata)
+    delta = {key: stats[key] - before[key] for key in stats}
+
+    results = []
+    blocks = []
+    for clip in clips:
+        handle, shm = _worker_extractor.buffer_pool.detach(clip.pop('frames'))
+        results.append((handle, clip))
+        blocks.append(shm)
+
+    # Unmap here; the blocks live on until the parent unlinks them
+    del clips
+    for shm in blocks:
+        shm.close()
+
+    return results, delta
+
+
+class ParallelClipExtractor:
+    """
+    Fan videos out across a process pool. Workers decode clips into
+    shared-memory blocks and return only handles and metadata, so frame
+    arrays are never pickled. Clips come back in video order.
+    """
+
+    def __init__(self, config, num_workers=None):
+        self.config = config
+        self.num_workers = num_workers or config['processing'].get('num_workers') or multiprocessing.cpu_count()
+        self._blocks = {}  # id(frames) -> shm
+        self._blocks_lock = threading.Lock()  # release_clip may run on storage writer threads
+        self.stats = empty_stats()
+
+        context = multiprocessing.get_context(config['processing'].get('start_method'))
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(config,)
+        )
+
+    def extract_videos(self, videos):
+        """Yield clips from sampler videos, in the order the videos arrive."""
+        pending = deque()
+        ready = deque()  # (handle, clip) of the video being handed out
+        videos = iter(videos)
+        max_in_flight = 2 * self.num_workers
+
+        try:
+            while True:
+                # Keep every worker busy with a bounded backlog
+                while len(pending) < max_in_flight:
+                    video = next(videos, None)
+                    if video is None:
+                        break
+                    pending.append(self._pool.submit(
+                        _extract_in_worker, video['video_bytes'], video['metadata']
+                    ))
+
+                if not pending:
+                    return
+
+                results, stats = pending.popleft().result()
+                self._add_stats(stats)
+                ready.extend(results)
+                while ready:
+                    handle, clip = ready.popleft()
+                    shm, frames = handle.attach()
+                    with self._blocks_lock:
+                        self._blocks[id(frames)] = shm
+                    clip['frames'] = frames
+                    yield clip
+        finally:
+            # Free the blocks nobody will consume
+            for future in pending:
+                if future.cancel() or future.exception() is not None:
+                    continue
+                ready.extend(future.result()[0])
+            for handle, _ in ready:
+                shm, _ = handle.attach()
+                free_block(shm)
+
+    def _add_stats(self, stats):
+        for key, value in stats.items():
+            self.stats[key] += value
+
+    def rejection_report(self):
+        return rejection_report(self.stats)
+
+    def segmentation_report(self):
+        return segmentation_report(self.stats)
+
+    def release_clip(self, clip):
+        """
+        Free a clip's shared-memory block once it has been saved or dropped.
+        Removes clip['frames'], which must not be used afterwards.
+        """
+        with self._blocks_lock:
+            shm = self._blocks.pop(id(clip['frames']), None)
+        if shm is not None:
+            del clip['frames']
+            free_block(shm)
+
+    def close(self):
+        self._pool.shutdown()
+        with self._blocks_lock:
+            blocks, self._blocks = self._blocks, {}
+        for shm in blocks.values():
+            free_block(shm)
@@ -0,0 +1,86 @@
+"""
+Background shard prefetching.
+"""
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+
+class ShardPrefetcher:
+    """
+    Fetch upcoming shards on background threads while the current one is
+    being decoded. Shards are handed out in order.
+
+    depth: how many shards may be fetched ahead of the consumer
+    max_bytes: disk budget for shards fetched ahead but not yet consumed;
+        the next shard is always fetched so the consumer never starves
+
+    Fetches run on daemon threads: a download the consumer no longer needs
+    (it stopped early) can't be cancelled, but it won't hold up exit either.
+    """
+
+    def __init__(self, fetch, filenames, depth=2, max_bytes=None):
+        self.fetch = fetch
+        self.filenames = list(filenames)
+        self.depth = max(1, depth)
+        self.max_bytes = max_bytes
+
+    def __iter__(self):
+        """Yield (filename, local_path, error) in order; error is None on success."""
+        names = iter(self.filenames)
+        pending = deque()
+
+        while True:
+            self._fill(pending, names)
+            if not pending:
+                return
+
+            filename, future = pending.popleft()
+            error = future.exception()
+
+            # Top the queue back up before handing the shard to the consumer
+            self._fill(pending, names)
+
+            if error is not None:
+                yield filename, None, error
+            else:
+                yield filename, future.result(), None
+
+    def _start(self, filename):
+        """Fetch one shard on a daemon thread; returns a Future for its local path."""
+        future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            try:
+                future.set_result(self.fetch(filename))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f'prefetch-{filename}', daemon=True).start()
+        return future
+
+    def _fill(self, pending, names):
+        """Start fetches up to depth while the disk budget allows."""
+        while len(pending) < self.depth:
+            if pending and not self._within_budget(pending):
+                return
+
+            filename = next(names, None)
+            if filename is None:
+                return
+
+            pending.append((filename, self._start(filename)))
+
+    def _within_budget(self, pending):
+        """Bytes of finished-but-unconsumed shards against max_bytes."""
+        if self.max_bytes is None:
+            return True
+
+        ready_bytes = 0
+        for _, future in pending:
+            if future.done() and future.exception() is None:
+                ready_bytes += os.path.getsize(future.result())
+
+        return ready_bytes < self.max_bytes
@@ -1,36 +1,310 @@
 """Quality filtering for clips."""
-from ego2robot.vision.motion import MotionScorer
-from ego2robot.vision.hands import HandDetector
+import importlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ego2robot.vision.motion import MotionScorer, motion_scorer_name
+
+# Used when the config has no quality section
+DEFAULT_STAGES = [{'name': 'motion'}, {'name': 'hand_visibility'}]
+
+
+class MotionStage:
+    """
+    Pixel motion score; reuses the one measured during decode if present.
+    With motion.scorer 'mv' the extractor attaches a motion-vector score
+    instead, which the frames alone can't reproduce.
+    """
+
+    threshold_key = 'min_motion_score'
+
+    def __init__(self, config):
+        self.scorer = MotionScorer(config)
+        self.vectors = motion_scorer_name(config) == 'mv'
+
+    def score(self, clip):
+        motion = clip.get('motion_score')
+        if motion is None:
+            if self.vectors:
+                raise ValueError("motion.scorer 'mv' scores clips from the source video during "
+                                 "extraction; this clip has no motion_score")
+            motion = self.scorer.score_clip(clip['frames'])
+        return motion
+
+
+class HandVisibilityStage:
+    """Fraction of sampled frames where MediaPipe finds a hand."""
+
+    threshold_key = 'min_hand_visibility'
+
+    def __init__(self, config):
+        # Deferred so configs without this stage never load MediaPipe
+        from ego2robot.vision.hands import HandDetector
+
+        self.pool = None
+        if (config.get('quality') or {}).get('hand_workers', 0) > 0:
+            from ego2robot.vision.hand_pool import HandDetectionPool
+            self.pool = HandDetectionPool(config)
+        self.detector = HandDetector(config, pool=self.pool)
+        self.threshold = None  # set by QualityFilter; early stopping decides against it
+
+        self.frames_processed = 0
+        self.candidate_frames = 0
+        self.decided_early = 0
+        self._lock = threading.Lock()  # pooled clips are scored from several threads
+
+    def score(self, clip):
+        hand_info = self.detector.process_clip(clip['frames'], threshold=self.threshold)
+        with self._lock:
+            self.frames_processed += hand_info['frames_processed']
+            self.candidate_frames += hand_info['candidate_frames']
+            self.decided_early += hand_info['decided_early']
+
+        # Saved with the clip so the export doesn't run MediaPipe on these frames again
+        clip['hand_landmarks'] = hand_info['landmarks']
+        return hand_info['visibility_score']
+
+    def summary(self):
+        if not self.detector.early_stop:
+            return None
+        return (f"hand early stop: {self.frames_processed}/{self.candidate_frames} frames run, "
+                f"{self.decided_early} clips decided early")
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+
+BUILTIN_STAGES = {
+    'motion': MotionStage,
+    'hand_visibility': HandVisibilityStage,
+}
+
+
+def default_motion_threshold(config):
+    """Motion threshold when the stage sets none, in the unit of the configured scorer."""
+    if motion_scorer_name(config) == 'mv':
+        return config['motion']['mv_threshold']
+    return config['clips'][MotionStage.threshold_key]
+
+
+def motion_threshold(config):
+    """Threshold the builtin motion stage applies, or None if the cascade has no such stage."""
+    for spec in (config.get('quality') or {}).get('stages') or DEFAULT_STAGES:
+        if spec['name'] == 'motion' and not spec.get('scorer'):
+            threshold = spec.get('threshold')
+            return default_motion_threshold(config) if threshold is None else threshold
+    return None
+
+
+def load_scorer(path, config):
+    """
+    Scorer from a 'package.module:Name' (or 'package.module.Name') path.
+    Classes are constructed with the config; anything else is used as is.
+    Either way the result must have score(clip) -> float.
+    """
+    module_name, _, attr = path.replace(':', '.').rpartition('.')
+    scorer = getattr(importlib.import_module(module_name), attr)
+    if isinstance(scorer, type):
+        scorer = scorer(config)
+    if not callable(getattr(scorer, 'score', None)):
+        raise TypeError(f"scorer {path!r} has no score(clip) method")
+    return scorer
+
+
+class FilterStage:
+    """One scorer + threshold in the cascade, with running statistics."""
+
+    def __init__(self, name, scorer, threshold):
+        self.name = name
+        self.scorer = scorer
+        self.threshold = threshold
+        self.seen = 0
+        self.passed = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()  # clips may be scored from several threads
+
+    def run(self, clip):
+        """Score one clip; returns (score, passed)."""
+        start = time.perf_counter()
+        score = self.scorer.score(clip)
+        elapsed = time.perf_counter() - start
+        passed = bool(score >= self.threshold)
+
+        with self._lock:
+            self.seconds += elapsed
+            self.seen += 1
+            self.passed += passed
+        return score, passed
+
+    @property
+    def cost(self):
+        """Mean seconds per clip."""
+        return self.seconds / self.seen if self.seen else 0.0
+
+    @property
+    def pass_rate(self):
+        return self.passed / self.seen if self.seen else 1.0
+
+    def rank(self):
+        """
+        Expected cost per rejection; running stages in increasing rank
+        minimises total cost for independent filters.
+        """
+        rejected = 1.0 - self.pass_rate
+        return self.cost / rejected if rejected > 0 else float('inf')
+
 
 class QualityFilter:
+    """
+    Ordered cascade of scoring stages (config: quality.stages). A clip is
+    dropped at the first stage it fails, so later, more expensive stages
+    only see clips that passed the cheap ones.
+    """
+
     def __init__(self, config):
         self.config = config
-        self.motion_scorer = MotionScorer(config)
-        self.hand_detector = HandDetector(config)
-        
+        quality_cfg = config.get('quality') or {}
+
+        self.stages = [self._build_stage(spec) for spec in quality_cfg.get('stages') or DEFAULT_STAGES]
+
+        # Re-rank stages from measured cost and pass rate every reorder_every clips
+        self.auto_order = quality_cfg.get('auto_order', False)
+        self.reorder_every = quality_cfg.get('reorder_every', 50)
+        self._clips_seen = 0
+        self._lock = threading.Lock()
+
+        # Clips in flight at once, so a hand-detection pool has work queued
+        self.lookahead = quality_cfg.get('lookahead')
+        if self.lookahead is None:
+            self.lookahead = 2 * quality_cfg.get('hand_workers', 0)
+        if self.lookahead > 1 and any(isinstance(stage.scorer, HandVisibilityStage) and stage.scorer.pool is None
+                                      for stage in self.stages):
+            # Without the pool every thread would share one MediaPipe graph
+            raise ValueError("quality.lookahead > 1 needs quality.hand_workers > 0 "
+                             "(the in-process MediaPipe graph is not thread-safe)")
+
+    def _build_stage(self, spec):
+        name = spec['name']
+        scorer_path = spec.get('scorer')
+
+        if scorer_path:
+            scorer = load_scorer(scorer_path, self.config)
+        elif name in BUILTIN_STAGES:
+            scorer = BUILTIN_STAGES[name](self.config)
+        else:
+            raise ValueError(f"quality stage {name!r} needs a scorer path (builtins: {sorted(BUILTIN_STAGES)})")
+
+        threshold = spec.get('threshold')
+        if threshold is None and isinstance(scorer, MotionStage):
+            threshold = default_motion_threshold(self.config)
+        if threshold is None:
+            key = getattr(scorer, 'threshold_key', None)
+            if key is None:
+                raise ValueError(f"quality stage {name!r} needs a threshold")
+            threshold = self.config['clips'][key]
+
+        if hasattr(scorer, 'threshold'):
+            scorer.threshold = threshold
+        return FilterStage(name, scorer, threshold)
+
     def filter_clips(self, clips):
         """Filter clips by quality scores."""
-        min_motion = self.config['clips']['min_motion_score']
-        min_hands = self.config['clips']['min_hand_visibility']
-        
-        filtered = []
-        
-        for clip in clips:
-            frames = clip['frames']
-            
-            # Score motion
-            motion = self.motion_scorer.score_clip(frames)
-            
-            # Score hands
-            hand_info = self.hand_detector.process_clip(frames)
-            hand_vis = hand_info['visibility_score']
-            
-            # Apply filters
-            if motion >= min_motion and hand_vis >= min_hands:
-                clip['quality_scores'] = {
-                    'motion': motion,
-                    'hand_visibility': hand_vis
-                }
-                filtered.append(clip)
-        
-        return filtered
\ No newline at end of file
+        return list(self.iter_filter(clips))
+
+    def iter_filter(self, clips, on_reject=None):
+        """
+        Yield clips that pass, one at a time.
+        on_reject: called with each rejected clip (e.g. to free its buffer)
+        """
+        if self.lookahead <= 1:
+            for clip in clips:
+                if self.accept(clip):
+                    yield clip
+                elif on_reject is not None:
+                    on_reject(clip)
+            return
+
+        # Score up to lookahead clips concurrently; results still come out in order
+        with ThreadPoolExecutor(max_workers=self.lookahead) as threads:
+            pending = deque()
+            clips = iter(clips)
+            while True:
+                while len(pending) < self.lookahead:
+                    clip = next(clips, None)
+                    if clip is None:
+                        break
+                    pending.append((clip, threads.submit(self.accept, clip)))
+
+                if not pending:
+                    return
+
+                clip, accepted = pending.popleft()
+                if accepted.result():
+                    yield clip
+                elif on_reject is not None:
+                    on_reject(clip)
+
+    def accept(self, clip):
+        """Run the cascade on one clip; records quality_scores and returns True if it passes."""
+        scores = {}
+        passed = True
+
+        for stage in list(self.stages):
+            scores[stage.name], passed = stage.run(clip)
+            if not passed:
+                break
+
+        with self._lock:
+            self._clips_seen += 1
+            if self.auto_order and self._clips_seen % self.reorder_every == 0:
+                self.reorder()
+
+        if passed:
+            clip['quality_scores'] = scores
+        return passed
+
+    def reorder(self):
+        """
+        Sort stages by measured cost per rejection. Stages that have not
+        seen a clip yet (everything was rejected before them) go first for
+        a round so they get measured too.
+        """
+        self.stages.sort(key=lambda stage: stage.rank() if stage.seen else float('-inf'))
+
+    def close(self):
+        """Shut down stages that hold worker pools."""
+        for stage in self.stages:
+            close = getattr(stage.scorer, 'close', None)
+            if close is not None:
+                close()
+
+    def stats(self):
+        """Per-stage counts and timings, in current order."""
+        return [
+            {
+                'name': stage.name,
+                'seen': stage.seen,
+                'passed': stage.passed,
+                'rejected': stage.seen - stage.passed,
+                'pass_rate': stage.pass_rate,
+                'seconds': stage.seconds,
+                'ms_per_clip': stage.cost * 1000,
+            }
+            for stage in self.stages
+        ]
+
+    def report(self):
+        """Per-stage summary lines."""
+        lines = [f"{'stage':<18} {'seen':>6} {'rejected':>9} {'pass':>6} {'ms/clip':>8} {'total':>8}"]
+        for s in self.stats():
+            lines.append(
+                f"{s['name']:<18} {s['seen']:>6} {s['rejected']:>9} {s['pass_rate']:>6.0%} "
+                f"{s['ms_per_clip']:>8.1f} {s['seconds']:>7.1f}s"
+            )
+        for stage in self.stages:
+            summary = getattr(stage.scorer, 'summary', None)
+            if summary is not None and summary():
+                lines.append(f"  {stage.name}: {summary()}")
+        return "\n".join(lines)
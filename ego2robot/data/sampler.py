@@ -3,84 +3,192 @@ from huggingface_hub import hf_hub_download
 import tarfile
 import json
 import os
+from ego2robot.data.tar_index import TarIndex, split_member_name
+from ego2robot.data.prefetch import ShardPrefetcher
+from ego2robot.data.catalog import ShardCatalog
 
 class EgocentricSampler:
     def __init__(self, config):
         self.config = config
+        self.cache_dir = "./data/cache"
+        self._resume_after = None
         
     def filter_videos(self):
-        """Download from multiple workers."""
-        repo_id = self.config['data']['dataset_name']
+        """Stream videos from this rank's shards."""
         max_videos = self.config['data'].get('max_videos', 3)
-        cache_dir = "./data/cache"
-        os.makedirs(cache_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        
+        # Optional subset / resume point (sample basenames)
+        sample_names = self.config['data'].get('samples')
+        self._resume_after = self.config['data'].get('resume_after')
         
         count = 0
-        factory = "factory_001"
         
-        # Process different workers - FIXED NAMING
-        workers = ["worker_001", "worker_002", "worker_003"]
+        # This process's slice of every factory/worker/part shard
+        rank = self.config['data'].get('rank', 0)
+        world_size = self.config['data'].get('world_size', 1)
+        filenames = ShardCatalog(self.config, self.cache_dir).assign(rank, world_size)
+        print(f"Rank {rank}/{world_size}: {len(filenames)} shards")
+        
+        # Download upcoming shards in the background while this one decodes
+        max_gb = self.config['data'].get('prefetch_max_gb')
+        prefetcher = ShardPrefetcher(
+            self._fetch_shard,
+            filenames,
+            depth=self.config['data'].get('prefetch_depth', 2),
+            max_bytes=int(max_gb * 1e9) if max_gb else None
+        )
+        
+        shards = iter(prefetcher)
+        try:
+            for filename, tar_path, error in shards:
+                if error is not None:
+                    print(f"Skipping {filename}: {error}")
+                    continue
+                
+                try:
+                    print(f"Extracting videos from {filename}...")
+                    
+                    for sample_name, video_bytes, metadata in self._iter_samples(tar_path, filename, sample_names):
+                        yield {
+                            'video_bytes': video_bytes,
+                            'metadata': metadata,
+                            'sample_id': count,
+                            'sample_name': sample_name,
+                            'shard': filename
+                        }
+                        
+                        count += 1
+                        if count >= max_videos:
+                            return
+                                
+                except Exception as e:
+                    print(f"Skipping {filename}: {e}")
+                    continue
+        finally:
+            # Start no further downloads
+            shards.close()
+        
+        print(f"✓ Sampled {count} videos")
+    
+    def _fetch_shard(self, filename):
+        """Local path of a shard, downloading it from the hub if needed."""
+        local_root = self.config['data'].get('local_root')
+        if local_root:
+            # Offline mirror laid out like the hub repo
+            tar_path = os.path.join(local_root, filename)
+            if not os.path.exists(tar_path):
+                raise FileNotFoundError(f"No shard at {tar_path}")
+            return tar_path
+        
+        print(f"Downloading {filename}...")
+        return hf_hub_download(
+            repo_id=self.config['data']['dataset_name'],
+            filename=filename,
+            repo_type="dataset",
+            cache_dir=self.cache_dir
+        )
+    
+    def index_path(self, filename):
+        """Sidecar offset index location for a shard."""
+        return os.path.join(self.cache_dir, 'index', filename.replace('/', '__') + '.index.json')
+    
+    def _iter_samples(self, tar_path, filename, sample_names=None):
+        """Yield (sample_name, video_bytes, metadata) from a shard tar."""
+        if self.config['data'].get('tar_index', False):
+            return self._iter_samples_indexed(tar_path, filename, sample_names)
         
-        for worker in workers:
-            if count >= max_videos:
-                break
+        if self.config['data'].get('streaming', True):
+            samples = self._iter_samples_streaming(tar_path)
+        else:
+            samples = self._iter_samples_members(tar_path)
+        
+        if sample_names is not None:
+            wanted = set(sample_names)
+            samples = (s for s in samples if s[0] in wanted)
+        return self._skip_to_resume_point(samples)
+    
+    def _skip_to_resume_point(self, samples):
+        """Drop samples up to and including data.resume_after."""
+        for sample in samples:
+            if self._resume_after is None:
+                yield sample
+            elif sample[0] == self._resume_after:
+                self._resume_after = None
+    
+    def _iter_samples_indexed(self, tar_path, filename, sample_names=None):
+        """Seek straight to samples using the persisted offset index."""
+        index = TarIndex.load_or_build(tar_path, self.index_path(filename))
+        
+        start_after = None
+        if self._resume_after is not None:
+            if self._resume_after not in index:
+                # Resume point is in a later shard
+                return
+            start_after, self._resume_after = self._resume_after, None
+        
+        yield from index.iter_samples(sample_names, start_after=start_after)
+    
+    def _iter_samples_streaming(self, tar_path):
+        """
+        Read the tar front to back in a single pass.
+        Each sample is yielded as soon as both its .mp4 and .json have been
+        seen, so nothing waits on a scan of the whole shard.
+        """
+        with tarfile.open(tar_path, 'r|') as tar:
+            pending = {}
+            
+            for member in tar:
+                # TarFile remembers every header it reads; drop them so
+                # memory stays flat over multi-GB shards
+                tar.members = []
+                
+                if not member.isfile():
+                    continue
+                    
+                basename, ext = split_member_name(member.name)
+                if ext not in ('mp4', 'json'):
+                    continue
                 
-            try:
-                # Format: factory001_worker001_part00.tar (NO underscores before numbers!)
-                worker_num = worker.split('_')[1]  # "001"
-                filename = f"{factory}/workers/{worker}/factory001_worker{worker_num}_part00.tar"
+                # Stream mode can only read the current member, so pull it now
+                member_file = tar.extractfile(member)
+                if ext == 'mp4':
+                    value = member_file.read()
+                else:
+                    value = json.load(member_file)
                 
-                print(f"Downloading {filename}...")
-                tar_path = hf_hub_download(
-                    repo_id=repo_id,
-                    filename=filename,
-                    repo_type="dataset",
-                    cache_dir=cache_dir
-                )
+                files = pending.setdefault(basename, {})
+                files[ext] = value
                 
-                print(f"Extracting videos from {worker}...")
+                if 'mp4' in files and 'json' in files:
+                    del pending[basename]
+                    yield basename, files['mp4'], files['json']
+    
+    def _iter_samples_members(self, tar_path):
+        """Index every member up front, then read the complete samples."""
+        with tarfile.open(tar_path, 'r') as tar:
+            samples = {}
+            
+            for member in tar.getmembers():
+                if not member.isfile():
+                    continue
+                    
+                basename, ext = split_member_name(member.name)
+                if ext is None:
+                    continue
                 
-                # Extract videos from tar
-                with tarfile.open(tar_path, 'r') as tar:
-                    samples = {}
+                if basename not in samples:
+                    samples[basename] = {}
+                samples[basename][ext] = member
+            
+            for basename, files in samples.items():
+                if 'mp4' in files and 'json' in files:
+                    mp4_member = files['mp4']
+                    video_file = tar.extractfile(mp4_member)
+                    video_bytes = video_file.read()
                     
-                    for member in tar.getmembers():
-                        if not member.isfile():
-                            continue
-                            
-                        name_parts = member.name.split('/')[-1].split('.')
-                        if len(name_parts) < 2:
-                            continue
-                            
-                        basename = '.'.join(name_parts[:-1])
-                        ext = name_parts[-1]
-                        
-                        if basename not in samples:
-                            samples[basename] = {}
-                        samples[basename][ext] = member
+                    json_member = files['json']
+                    json_file = tar.extractfile(json_member)
+                    metadata = json.load(json_file)
                     
-                    for basename, files in samples.items():
-                        if 'mp4' in files and 'json' in files:
-                            mp4_member = files['mp4']
-                            video_file = tar.extractfile(mp4_member)
-                            video_bytes = video_file.read()
-                            
-                            json_member = files['json']
-                            json_file = tar.extractfile(json_member)
-                            metadata = json.load(json_file)
-                            
-                            yield {
-                                'video_bytes': video_bytes,
-                                'metadata': metadata,
-                                'sample_id': count
-                            }
-                            
-                            count += 1
-                            if count >= max_videos:
-                                return
-                            
-            except Exception as e:
-                print(f"Skipping worker {worker}: {e}")
-                continue
-        
-        print(f"✓ Sampled {count} videos")
\ No newline at end of file
+                    yield basename, video_bytes, metadata
@@ -0,0 +1,141 @@
+"""
+Find active spans in a video from one cheap low-resolution pass.
+"""
+import cv2
+import numpy as np
+
+
+class ActivitySegmenter:
+    """
+    Scans a video once at scan_fps and scan_resolution, builds a per-sample
+    motion signal (optionally gated on hand presence), and places clip
+    windows only inside the spans where it stays above threshold.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        clips_cfg = config['clips']
+
+        self.scan_fps = clips_cfg.get('scan_fps', 3)
+        self.scan_size = tuple(clips_cfg.get('scan_resolution', [36, 64]))
+        # At 3 scan fps, diffs are 1/3 s apart like MotionScorer's, so the
+        # clip threshold carries over
+        self.threshold = clips_cfg.get('activity_threshold')
+        if self.threshold is None:  # an explicit 0 is a valid threshold
+            self.threshold = clips_cfg['min_motion_score']
+        self.smoothing = clips_cfg.get('activity_smoothing', 2.0)
+        self.stride = clips_cfg.get('activity_stride') or clips_cfg['target_duration']
+
+        self.hands = None
+        if clips_cfg.get('activity_hands', False):
+            # Only pulled in when asked for; mediapipe is slow to import
+            from ego2robot.vision.hands import HandDetector
+            self.hands = HandDetector(config).hands
+            self.hand_size = tuple(clips_cfg.get('hand_scan_resolution', [180, 320]))
+
+    def scan(self, reader):
+        """
+        Decode the whole video once, converting only the sampled frames at
+        scan size. Returns (times, motion, hands); hands is None unless
+        activity_hands is on. Leaves the reader rewound to frame 0.
+        """
+        step = max(1, int(round(reader.fps / self.scan_fps)))
+        hand_every = max(1, int(round(self.scan_fps)))  # about once a second
+
+        times, motion, hands = [], [], []
+        prev = None
+        has_hands = False
+        frame_idx = 0
+
+        reader.seek(0)
+        while reader.grab():
+            if frame_idx % step == 0:
+                small = reader.retrieve(size=self.scan_size)
+                if small is None:
+                    break
+
+                gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+                motion.append(0.0 if prev is None else cv2.absdiff(prev, gray).mean() / 255.0)
+                times.append(frame_idx / reader.fps)
+                prev = gray
+
+                if self.hands is not None:
+                    if (len(times) - 1) % hand_every == 0:
+                        frame = reader.retrieve(size=self.hand_size)
+                        results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                        has_hands = bool(results.multi_hand_landmarks)
+                    hands.append(has_hands)
+            frame_idx += 1
+        reader.seek(0)
+
+        motion = np.asarray(motion)
+        if len(motion) > 1:
+            motion[0] = motion[1]  # first sample has nothing to diff against
+
+        return np.asarray(times), motion, (np.asarray(hands, dtype=float) if self.hands is not None else None)
+
+    def active_mask(self, motion, hands=None):
+        """Per-sample activity: smoothed motion (and hand presence) above threshold."""
+        if len(motion) == 0:
+            return np.zeros(0, dtype=bool)
+
+        width = max(1, int(round(self.smoothing * self.scan_fps)))
+        kernel = np.ones(width) / width
+        active = np.convolve(motion, kernel, mode='same') >= self.threshold
+
+        if hands is not None:
+            min_hands = self.config['clips']['min_hand_visibility']
+            active &= np.convolve(hands, kernel, mode='same') >= min_hands
+
+        return active
+
+    def spans(self, times, active, duration):
+        """Contiguous active runs as (start, end) seconds."""
+        spans = []
+        start = None
+        sample = 1.0 / self.scan_fps
+
+        for t, is_active in zip(times, active):
+            if is_active and start is None:
+                start = float(t)
+            elif not is_active and start is not None:
+                spans.append((start, float(t)))
+                start = None
+        if start is not None:
+            spans.append((start, min(float(times[-1]) + sample, duration)))
+
+        return spans
+
+    def window_starts(self, spans, duration):
+        """
+        Clip start times tiled inside each span. Spans shorter than a clip
+        get one window centred on them if they cover at least half of it.
+        """
+        target_duration = self.config['clips']['target_duration']
+        starts = []
+
+        for span_start, span_end in spans:
+            length = span_end - span_start
+            if length < target_duration:
+                if length < target_duration / 2:
+                    continue
+                centre = (span_start + span_end) / 2
+                start = min(max(centre - target_duration / 2, 0.0), duration - target_duration)
+                if start >= 0 and (not starts or start >= starts[-1] + self.stride):
+                    starts.append(start)
+                continue
+
+            start = span_start
+            while start + target_duration <= span_end:
+                if not starts or start >= starts[-1] + self.stride:
+                    starts.append(start)
+                start += self.stride
+
+        return starts
+
+    def segment(self, reader, duration):
+        """Scan a video; returns (window start times, seconds active)."""
+        times, motion, hands = self.scan(reader)
+        active = self.active_mask(motion, hands)
+        spans = self.spans(times, active, duration)
+        return self.window_starts(spans, duration), sum(end - start for start, end in spans)
@@ -1,8 +1,20 @@
 # ego2robot/data/storage.py
 """Save clips to disk."""
+import cv2
 import numpy as np
-import json
+import glob
 import os
+import threading
+from collections import deque
+from ego2robot.data.manifest import ManifestStore, open_manifest
+from ego2robot.data.writer import AsyncWriter, fsync_file, save_array, save_arrays_compressed
+
+# output.format -> (fourcc, extension); 'npy' stores raw arrays
+VIDEO_FORMATS = {
+    'ffv1': ('FFV1', '.mkv'),   # lossless; slow to decode and to seek
+    'mjpeg': ('MJPG', '.avi'),  # near-lossless, cheap per-frame random access
+    'mp4': ('mp4v', '.mp4'),    # smallest, lossy
+}
 
 class ClipStorage:
     def __init__(self, config):
@@ -10,45 +22,424 @@ class ClipStorage:
         self.output_dir = config['output']['local_dir']
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Distributed runs write one manifest per rank, merged afterwards
+        self.rank = config['data'].get('rank', 0)
+        self.world_size = config['data'].get('world_size', 1)
+        
+        # Frames as raw .npy, one arena file, or encoded video (see VIDEO_FORMATS)
+        self.format = config['output'].get('format', 'npy')
+        if self.format not in ('npy', 'arena') and self.format not in VIDEO_FORMATS:
+            raise ValueError(f"output.format must be 'npy', 'arena' or one of {sorted(VIDEO_FORMATS)}, "
+                             f"got {self.format!r}")
+        self.fps = config['processing']['target_fps']
+        self._arena = None
+        self._arena_lock = threading.Lock()  # appends may come from several writer threads
+        
+        # Each clip is committed to the manifest once its files are written;
+        # clip numbers continue from earlier runs into the same output_dir
+        # (an output dir from before the manifest database keeps its clips)
+        self.manifest = open_manifest(self.output_dir, self._manifest_name(), create=True)
+        self._next_seq = self.manifest.next_seq()
+        self._uncommitted = deque()  # (seq, futures, metadata) in save order
+        
+        # File writes (and their compression / fsync) run behind the caller
+        self.fsync = config['output'].get('fsync', False)
+        self.writer = AsyncWriter(config['output'].get('write_threads', 0), config['output'].get('write_queue', 8))
+        
+        self.num_saved = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        
     def save_clips(self, clips):
-        """Save clips as numpy arrays."""
-        manifest = []
+        """
+        Save clips as numpy arrays or video files (output.format) and
+        flush(); returns the JSON manifest path. The storage stays open for
+        more clips until close().
+        """
+        for clip in clips:
+            self.save_clip(clip)
         
-        for i, clip in enumerate(clips):
-            clip_id = f"clip_{i:04d}"
-            
-            # Save frames
-            frames_path = os.path.join(self.output_dir, f"{clip_id}.npy")
-            np.save(frames_path, clip['frames'])
-            
-            # Create metadata - handle both 'metadata' and source metadata
-            source_meta = clip.get('metadata', {})
-            if not source_meta:
-                # Try alternative key name
-                source_meta = {
-                    'factory_id': 'unknown',
-                    'worker_id': 'unknown'
-                }
-            
-            metadata = {
-                'clip_id': clip_id,
-                'start_time': clip.get('start_time', 0),
-                'duration': clip.get('duration', 0),
-                'source_metadata': source_meta,
-                'quality_scores': clip.get('quality_scores', {}),
-                'frames_path': frames_path,
-                'num_frames': len(clip['frames']),
-                'shape': list(clip['frames'].shape)
+        return self.flush()
+    
+    def save_clip(self, clip, on_written=None):
+        """
+        Save one clip; its record is committed to the manifest once its
+        files are written (straight away unless output.write_threads > 0).
+        on_written(clip): called once the frames have been written and the
+        buffer can be reused (from a writer thread when writes are async).
+        """
+        seq = self._next_seq
+        self._next_seq += 1
+        clip_id = self._clip_id(seq)
+        frames = clip['frames']
+        
+        # Save frames
+        futures = [self.writer.submit(self._save_frames, clip_id, frames)]
+        if on_written is not None:
+            futures[0].add_done_callback(lambda _: on_written(clip))
+        self.raw_bytes += frames.nbytes
+        
+        # Create metadata - extractors put the video's metadata under 'source_metadata'
+        source_meta = clip.get('source_metadata') or clip.get('metadata', {})
+        if not source_meta:
+            source_meta = {
+                'factory_id': 'unknown',
+                'worker_id': 'unknown'
             }
+        
+        metadata = {
+            'clip_id': clip_id,
+            'start_time': clip.get('start_time', 0),
+            'duration': clip.get('duration', 0),
+            'source_metadata': source_meta,
+            'quality_scores': clip.get('quality_scores', {}),
+            'frames_path': None,  # filled in once written
+            'frames_format': self.format,
+            'num_frames': len(frames),
+            'shape': list(frames.shape)
+        }
+        
+        # Landmarks from the hand-visibility stage, reused by HandTracker
+        if clip.get('hand_landmarks') is not None:
+            hands_path = os.path.join(self.output_dir, f"{clip_id}_hands.npz")
+            futures.append(self.writer.submit(save_arrays_compressed, hands_path, clip['hand_landmarks'], self.fsync))
+            metadata['hands_path'] = hands_path
+        
+        self._uncommitted.append((seq, futures, metadata))
+        self._commit_written()
+        
+        return metadata
+    
+    def _commit_written(self, wait=False):
+        """
+        Commit records whose files are all written, in save order, so a
+        committed record never points at missing frames. Raises the first
+        failed write.
+        """
+        while self._uncommitted:
+            seq, futures, metadata = self._uncommitted[0]
+            if not wait and not all(future.done() for future in futures):
+                break
+            
+            self._uncommitted.popleft()
+            metadata['frames_path'], stored_bytes = futures[0].result()
+            for future in futures[1:]:
+                future.result()
             
-            manifest.append(metadata)
+            self.manifest.add(metadata, seq)
+            self.stored_bytes += stored_bytes
+            self.num_saved += 1
+    
+    def flush(self):
+        """Wait for pending writes, commit them and write the manifest's JSON snapshot; returns the JSON path."""
+        self._commit_written(wait=True)
+        return self.manifest.export_json(self.manifest_path())
+    
+    def close(self):
+        """
+        Wait for pending writes, commit them, and write the manifest's JSON
+        snapshot; returns the JSON path. Clips written before a failed write
+        are still committed.
+        """
+        try:
+            self._commit_written(wait=True)
+        finally:
+            try:
+                self.writer.close(raise_errors=False)  # failures surface through the futures above
+            finally:
+                if self._arena is not None:
+                    self._arena.close()
+                    self._arena = None
+                
+                # JSON copy of the whole manifest for readers that don't use ManifestStore
+                manifest_path = self.manifest.export_json(self.manifest_path())
+                total = len(self.manifest)
+                self.manifest.close()
         
-        # Save manifest
-        manifest_path = os.path.join(self.output_dir, 'clips_manifest.json')
-        with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        print(f"✓ Saved {self.num_saved} clips to {self.output_dir} ({total} in manifest)")
+        if self.num_saved:
+            print(f"✓ Frames: {self.stored_bytes / 1e6:.1f} MB on disk ({self.format}), "
+                  f"{self.raw_bytes / 1e6:.1f} MB raw, {self.raw_bytes / max(self.stored_bytes, 1):.1f}x smaller")
+        if self.writer.num_threads:
+            print(f"✓ Writes: {self.writer.num_written} on {self.writer.num_threads} threads, "
+                  f"{self.writer.wait_seconds:.1f}s waiting on a full queue")
+        print(f"✓ Manifest: {self.manifest_db_path()} (JSON: {manifest_path})")
         
-        print(f"✓ Saved {len(clips)} clips to {self.output_dir}")
-        print(f"✓ Manifest: {manifest_path}")
+        return manifest_path
+    
+    def _save_frames(self, clip_id, frames):
+        """Write a clip's frames in the configured format; returns (frames_path, bytes on disk)."""
+        if self.format == 'npy':
+            path = os.path.join(self.output_dir, f"{clip_id}.npy")
+            save_array(path, frames, self.fsync)
+            return path, os.path.getsize(path)
         
-        return manifest_path
\ No newline at end of file
+        if self.format == 'arena':
+            with self._arena_lock:
+                if self._arena is None:
+                    self._arena = ClipArena(self.arena_path(), mode='a')
+                ref = self._arena.append(frames, self.fsync)
+            return f"{self._arena.path}#{ref}", frames.nbytes
+        
+        fourcc, ext = VIDEO_FORMATS[self.format]
+        path = os.path.join(self.output_dir, f"{clip_id}{ext}")
+        h, w = frames.shape[1:3]
+        writer = cv2.VideoWriter(path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*fourcc), self.fps, (w, h))
+        if not writer.isOpened():
+            raise RuntimeError(f"OpenCV can't write {self.format} ({fourcc}) video to {path}")
+        try:
+            for frame in frames:
+                writer.write(frame)
+        finally:
+            writer.release()
+        if self.fsync:
+            fsync_file(path)
+        return path, os.path.getsize(path)
+    
+    def _manifest_name(self):
+        """This rank's manifest file name, without extension."""
+        if self.world_size > 1:
+            return f'clips_manifest.rank{self.rank:03d}'
+        return 'clips_manifest'
+    
+    def manifest_db_path(self):
+        """This rank's manifest database."""
+        return os.path.join(self.output_dir, self._manifest_name() + '.db')
+    
+    def manifest_path(self):
+        """This rank's JSON manifest snapshot."""
+        return os.path.join(self.output_dir, self._manifest_name() + '.json')
+    
+    def arena_path(self):
+        """This rank's arena file (output.format: arena)."""
+        if self.world_size > 1:
+            return os.path.join(self.output_dir, f'clips.rank{self.rank:03d}.arena')
+        return os.path.join(self.output_dir, 'clips.arena')
+    
+    def _clip_id(self, i):
+        """Clip IDs carry the rank so per-rank manifests merge without clashes."""
+        if self.world_size > 1:
+            return f"clip_r{self.rank:03d}_{i:04d}"
+        return f"clip_{i:04d}"
+
+
+def merge_manifests(output_dir):
+    """
+    Merge per-rank manifests into clips_manifest.db (+ .json snapshot),
+    ordered by rank. Clips already in the merged manifest are kept as is.
+    """
+    rank_paths = sorted(glob.glob(os.path.join(output_dir, 'clips_manifest.rank*.db')))
+    if not rank_paths:
+        raise FileNotFoundError(f"No per-rank manifests in {output_dir}")
+    
+    merged = open_manifest(output_dir, create=True)
+    added = 0
+    for path in rank_paths:
+        rank_store = ManifestStore(path)
+        added += merged.import_records(rank_store.records())
+        rank_store.close()
+    
+    manifest_path = merged.export_json(os.path.join(output_dir, 'clips_manifest.json'))
+    total = len(merged)
+    merged.close()
+    
+    print(f"✓ Merged {len(rank_paths)} rank manifests ({added} new clips, {total} total)")
+    print(f"✓ Manifest: {manifest_path}")
+    
+    return manifest_path
+
+
+class ClipReader:
+    """
+    Random access to the frames of a saved clip (.npy, video or arena ref).
+    reader[i] / reader[a:b] decode only the frames asked for; reading in
+    order never seeks. Use as a context manager or call close().
+    """
+    
+    # Decode forward instead of seeking for jumps up to this many frames
+    # (OpenCV seeks re-decode from a few frames back anyway)
+    SEEK_THRESHOLD = 8
+    
+    def __init__(self, path):
+        self.path = path
+        self._cap = None
+        self._array = None
+        
+        arena_ref = split_arena_ref(path)
+        if arena_ref is not None:
+            self._array = open_arena(arena_ref[0]).clip(arena_ref[1])
+            self.num_frames = len(self._array)
+            self.shape = self._array.shape
+            return
+        
+        if path.endswith('.npy'):
+            self._array = np.load(path, mmap_mode='r')
+            self.num_frames = len(self._array)
+            self.shape = self._array.shape
+            return
+        
+        self._cap = cv2.VideoCapture(path, cv2.CAP_FFMPEG)
+        if not self._cap.isOpened():
+            raise IOError(f"Can't open clip video {path}")
+        self.num_frames = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        h = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        w = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.shape = (self.num_frames, h, w, 3)
+        self._next_index = 0
+    
+    def __len__(self):
+        return self.num_frames
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.read(*index.indices(self.num_frames))
+        if index < 0:
+            index += self.num_frames
+        if not 0 <= index < self.num_frames:
+            raise IndexError(f"frame {index} out of range for {self.num_frames} frames")
+        return self.read(index, index + 1)[0]
+    
+    def read(self, start=0, stop=None, step=1):
+        """Frames[start:stop:step] as a (n, h, w, 3) uint8 array."""
+        stop = self.num_frames if stop is None else stop
+        if self._array is not None:
+            return np.array(self._array[start:stop:step])
+        
+        indices = range(start, stop, step)
+        frames = np.empty((len(indices),) + self.shape[1:], dtype=np.uint8)
+        for i, index in enumerate(indices):
+            if self._next_index < index <= self._next_index + self.SEEK_THRESHOLD:
+                while self._next_index < index and self._cap.grab():
+                    self._next_index += 1
+            elif index != self._next_index:
+                self._cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ok, _ = self._cap.read(frames[i])
+            if not ok:
+                raise IOError(f"Can't decode frame {index} of {self.path}")
+            self._next_index = index + 1
+        return frames
+    
+    def close(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._array = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_frames(path):
+    """
+    All frames of a saved clip as a (T, h, w, 3) uint8 array. Arena refs
+    ('clips.arena#12') come back as read-only memmap views, without a copy.
+    """
+    arena_ref = split_arena_ref(path)
+    if arena_ref is not None:
+        return open_arena(arena_ref[0]).clip(arena_ref[1])
+    if path.endswith('.npy'):
+        return np.load(path)
+    with ClipReader(path) as reader:
+        return reader.read()
+
+
+def split_arena_ref(path):
+    """(arena_path, ref) for a '<file>.arena#<ref>' frames path, else None."""
+    arena_path, sep, ref = path.rpartition('#')
+    if sep and arena_path.endswith('.arena') and ref.isdigit():
+        return arena_path, int(ref)
+    return None
+
+
+class ClipArena:
+    """
+    Clips appended back to back in one uint8 file, plus a fixed-size
+    record per clip (offset, shape) in '<path>.index'. Readers map the
+    whole file once and hand out views, so a clip or frame range costs no
+    open() and no copy, and processes reading the same arena share pages.
+    """
+    
+    INDEX_DTYPE = np.dtype([('offset', '<i8'), ('num_frames', '<i4'), ('height', '<i4'),
+                            ('width', '<i4'), ('channels', '<i4')])
+    
+    def __init__(self, path, mode='r'):
+        """mode: 'r' to read, 'w' to start a new arena, 'a' to append to one."""
+        self.path = path
+        self.index_path = path + '.index'
+        self.mode = mode
+        self._data = None
+        
+        if mode == 'r':
+            self._load()
+        else:
+            self._file = open(path, mode + 'b')
+            self._index_file = open(self.index_path, mode + 'b')
+            self._offset = self._file.seek(0, os.SEEK_END)
+            self._count = self._index_file.seek(0, os.SEEK_END) // self.INDEX_DTYPE.itemsize
+    
+    def _load(self):
+        """(Re)read the index and map the data file."""
+        self.index = np.fromfile(self.index_path, dtype=self.INDEX_DTYPE)
+        self._data = np.memmap(self.path, dtype=np.uint8, mode='r') if os.path.getsize(self.path) else None
+    
+    def __len__(self):
+        return self._count if self.mode != 'r' else len(self.index)
+    
+    def append(self, frames, fsync=False):
+        """Write one clip's (T, h, w, c) uint8 frames; returns its ref."""
+        frames = np.ascontiguousarray(frames, dtype=np.uint8)
+        self._file.write(memoryview(frames).cast('B'))
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+        
+        # Index record goes in after the data, so it never points past the end
+        record = np.array([(self._offset,) + frames.shape], dtype=self.INDEX_DTYPE)
+        self._index_file.write(record.tobytes())
+        self._index_file.flush()
+        if fsync:
+            os.fsync(self._index_file.fileno())
+        
+        self._offset += frames.nbytes
+        self._count += 1
+        return self._count - 1
+    
+    def clip(self, ref):
+        """Read-only (T, h, w, c) view of one clip."""
+        return self.frames(ref)
+    
+    def frames(self, ref, start=0, stop=None):
+        """Read-only view of frames[start:stop] of one clip."""
+        if ref >= len(self.index):
+            self._load()  # appended to since it was opened
+        
+        offset, num_frames, h, w, c = self.index[ref].tolist()
+        stop = num_frames if stop is None else min(stop, num_frames)
+        frame_bytes = h * w * c
+        view = self._data[offset + start * frame_bytes:offset + stop * frame_bytes]
+        return view.reshape(max(stop - start, 0), h, w, c)
+    
+    def close(self):
+        if self.mode != 'r':
+            self._file.close()
+            self._index_file.close()
+        self._data = None
+
+
+# Arenas opened for reading, shared by load_frames / ClipReader in this process
+_open_arenas = {}
+
+
+def open_arena(path):
+    """Read-only ClipArena for path, mapped once per process."""
+    arena = _open_arenas.get(path)
+    if arena is None:
+        arena = _open_arenas[path] = ClipArena(path)
+    return arena
+
+
+def close_arenas():
+    """Drop this process's arena mappings (views already handed out stay valid)."""
+    _open_arenas.clear()
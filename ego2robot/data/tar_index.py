@@ -0,0 +1,139 @@
+"""
+Persistent byte-offset index for shard tars.
+"""
+import json
+import os
+import tarfile
+from ego2robot.data.video_io import ByteRange
+
+
+class TarIndex:
+    """
+    Maps sample basename -> (offset, size) of its .mp4 and .json members.
+    Saved as a sidecar JSON so later runs can seek straight to any sample.
+    """
+
+    EXTENSIONS = ('mp4', 'json')
+
+    def __init__(self, tar_path, samples, tar_size=None):
+        self.tar_path = tar_path
+        self.samples = samples  # basename -> {ext: [offset, size]}, in tar order
+        self.tar_size = tar_size if tar_size is not None else os.path.getsize(tar_path)
+
+    @classmethod
+    def build(cls, tar_path):
+        """Walk the tar headers once and record where each member's data lives."""
+        samples = {}
+
+        with tarfile.open(tar_path, 'r:') as tar:
+            for member in tar:
+                tar.members = []
+
+                if not member.isfile():
+                    continue
+
+                basename, ext = split_member_name(member.name)
+                if ext not in cls.EXTENSIONS:
+                    continue
+
+                samples.setdefault(basename, {})[ext] = [member.offset_data, member.size]
+
+        # Only keep complete samples
+        samples = {
+            name: files for name, files in samples.items()
+            if all(ext in files for ext in cls.EXTENSIONS)
+        }
+
+        return cls(tar_path, samples)
+
+    @classmethod
+    def load(cls, tar_path, index_path):
+        """Load a saved index, or None if missing or stale."""
+        if not os.path.exists(index_path):
+            return None
+
+        with open(index_path) as f:
+            data = json.load(f)
+
+        # A re-downloaded shard invalidates the offsets
+        if data.get('tar_size') != os.path.getsize(tar_path):
+            return None
+
+        return cls(tar_path, data['samples'], data['tar_size'])
+
+    @classmethod
+    def load_or_build(cls, tar_path, index_path):
+        """Load the sidecar index, building and saving it on first sight."""
+        index = cls.load(tar_path, index_path)
+        if index is None:
+            print(f"Indexing {os.path.basename(tar_path)}...")
+            index = cls.build(tar_path)
+            index.save(index_path)
+        return index
+
+    def save(self, index_path):
+        """Write the index atomically next to the cache."""
+        os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'tar_size': self.tar_size, 'samples': self.samples}, f)
+        os.replace(tmp_path, index_path)
+
+    def names(self):
+        """Sample basenames in tar order."""
+        return list(self.samples)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __contains__(self, basename):
+        return basename in self.samples
+
+    def read(self, basename, ext, f=None):
+        """Read one member's bytes by seeking directly to it."""
+        offset, size = self.samples[basename][ext]
+
+        if f is None:
+            with open(self.tar_path, 'rb') as f:
+                f.seek(offset)
+                return f.read(size)
+
+        f.seek(offset)
+        return f.read(size)
+
+    def byte_range(self, basename, ext):
+        """Where a member's bytes live in the tar, for decoding in place."""
+        offset, size = self.samples[basename][ext]
+        return ByteRange(self.tar_path, offset, size)
+
+    def iter_samples(self, names=None, start_after=None):
+        """
+        Yield (basename, video ByteRange, metadata) without scanning the tar.
+        The video is left in the tar and decoded from there.
+
+        names: only these samples; ones not in this shard are skipped
+        start_after: resume after this sample basename
+        """
+        if names is None:
+            names = self.names()
+        else:
+            names = [name for name in names if name in self.samples]
+
+        if start_after is not None:
+            position = {name: i for i, name in enumerate(self.samples)}
+            cut = position[start_after]
+            names = [name for name in names if position[name] > cut]
+
+        with open(self.tar_path, 'rb') as f:
+            for basename in names:
+                metadata = json.loads(self.read(basename, 'json', f))
+
+                yield basename, self.byte_range(basename, 'mp4'), metadata
+
+def split_member_name(name):
+    """Split 'dir/sample.ext' into ('sample', 'ext')."""
+    name_parts = name.split('/')[-1].split('.')
+    if len(name_parts) < 2:
+        return None, None
+    return '.'.join(name_parts[:-1]), name_parts[-1]
@@ -0,0 +1,270 @@
+"""
+Open videos straight from memory or from a byte range of a cached tar.
+"""
+import io
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+
+import cv2
+
+try:
+    import av
+except ImportError:  # PyAV is only needed for processing.decoder: pyav
+    av = None
+
+
+class ByteRange:
+    """
+    A member's bytes inside a file on disk (offset, size).
+    Stands in for video_bytes so videos can be decoded from the cached
+    shard without copying them out of it.
+    """
+
+    def __init__(self, path, offset, size):
+        self.path = path
+        self.offset = offset
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"ByteRange({self.path!r}, offset={self.offset}, size={self.size})"
+
+    def read(self):
+        """Copy the bytes out (only needed by the temp-file fallback)."""
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            return f.read(self.size)
+
+
+class _MappedRangeReader(io.BufferedIOBase):
+    """Seekable file-like view over a memory-mapped byte range.
+    (cv2 stream input requires a BufferedIOBase.)"""
+
+    def __init__(self, byte_range):
+        self._file = open(byte_range.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)[byte_range.offset:byte_range.offset + byte_range.size]
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        else:
+            pos = len(self._view) + offset
+        self._pos = min(max(pos, 0), len(self._view))
+        return self._pos
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = end
+        return data
+
+    read1 = read
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+            self._map.close()
+            self._file.close()
+        super().close()
+
+
+def open_stream(source):
+    """File-like object over video bytes or a ByteRange, without copying."""
+    if isinstance(source, ByteRange):
+        return _MappedRangeReader(source)
+    # BytesIO shares the bytes object's buffer until written to
+    return io.BytesIO(source)
+
+
+@contextmanager
+def open_capture(source):
+    """
+    cv2.VideoCapture reading directly from video bytes or a ByteRange.
+    Falls back to a temp file on OpenCV builds without stream input (< 4.10).
+    """
+    stream = open_stream(source)
+    temp_path = None
+
+    try:
+        try:
+            cap = cv2.VideoCapture(stream, cv2.CAP_FFMPEG, [])
+        except (TypeError, SystemError, cv2.error):
+            cap = None
+
+        if cap is None or not cap.isOpened():
+            stream.close()
+            data = source.read() if isinstance(source, ByteRange) else source
+            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
+                f.write(data)
+                temp_path = f.name
+            cap = cv2.VideoCapture(temp_path)
+
+        try:
+            yield cap
+        finally:
+            cap.release()
+    finally:
+        stream.close()
+        if temp_path is not None:
+            os.unlink(temp_path)
+
+
+class OpenCVReader:
+    """
+    Frame reader over cv2.VideoCapture.
+    grab() only advances the decoder; pixels are converted and resized to
+    the target size in retrieve(), so dropped frames cost no conversion.
+    """
+
+    def __init__(self, cap, size):
+        self.cap = cap
+        self.height, self.width = size
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def seek(self, index):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+
+    def grab(self):
+        return self.cap.grab()
+
+    def retrieve(self, size=None, out=None):
+        """
+        Last grabbed frame as BGR at the target (or given) size, or None.
+        out: preallocated (h, w, 3) uint8 array to write into
+        """
+        ret, frame = self.cap.retrieve()
+        if not ret:
+            return None
+        h, w = size or (self.height, self.width)
+        return cv2.resize(frame, (w, h), dst=out)
+
+
+class PyAVReader:
+    """
+    Frame reader over PyAV.
+    Kept frames are scaled and converted to BGR in a single swscale pass
+    straight from the decoder's YUV planes, so there is no full-resolution
+    BGR frame and no separate resize.
+    """
+
+    # Decode forward instead of seeking for jumps shorter than this (seconds)
+    SEEK_THRESHOLD = 2.0
+
+    def __init__(self, source, size):
+        self.height, self.width = size
+        self._file = open_stream(source)
+        self._container = None
+        try:
+            self._container = av.open(self._file)
+            self._stream = self._container.streams.video[0]
+        except Exception:
+            # Not a readable video: don't leak the stream (or a half-open container)
+            if self._container is not None:
+                self._container.close()
+            self._file.close()
+            raise
+        self._stream.thread_type = 'AUTO'
+
+        self.fps = float(self._stream.average_rate)
+        self._time_base = float(self._stream.time_base)
+        self._start_pts = self._stream.start_time or 0
+        self.frame_count = self._stream.frames
+        if not self.frame_count and self._stream.duration:
+            self.frame_count = int(self._stream.duration * self._time_base * self.fps)
+
+        self._frames = self._container.decode(self._stream)
+        self._frame = None
+        self._pending = None
+        self._next_index = 0
+
+    def _frame_index(self, frame):
+        return int(round((frame.pts - self._start_pts) * self._time_base * self.fps))
+
+    def seek(self, index):
+        if index == self._next_index:
+            return
+
+        if self._next_index < index < self._next_index + self.SEEK_THRESHOLD * self.fps:
+            while self._next_index < index and self.grab():
+                pass
+            return
+
+        # Jump to the keyframe at or before index, then decode up to it
+        pts = self._start_pts + int(index / self.fps / self._time_base)
+        self._container.seek(pts, stream=self._stream, backward=True)
+        self._frames = self._container.decode(self._stream)
+        self._pending = None
+
+        for frame in self._frames:
+            if frame.pts is not None and self._frame_index(frame) >= index:
+                self._pending = frame
+                break
+        self._next_index = index
+
+    def grab(self):
+        if self._pending is not None:
+            self._frame, self._pending = self._pending, None
+        else:
+            self._frame = next(self._frames, None)
+
+        if self._frame is None:
+            return False
+        self._next_index += 1
+        return True
+
+    def retrieve(self, size=None, out=None):
+        """
+        Last grabbed frame as BGR at the target (or given) size, or None.
+        out: preallocated (h, w, 3) uint8 array to write into
+        """
+        if self._frame is None:
+            return None
+        h, w = size or (self.height, self.width)
+        frame = self._frame.to_ndarray(width=w, height=h, format='bgr24', interpolation='BILINEAR')
+        if out is None:
+            return frame
+        out[...] = frame
+        return out
+
+    def close(self):
+        self._container.close()
+        self._file.close()
+
+
+@contextmanager
+def open_reader(source, size, backend='opencv'):
+    """Frame reader for video bytes or a ByteRange, or None if it can't be opened."""
+    if backend == 'pyav':
+        if av is None:
+            raise ImportError("processing.decoder 'pyav' needs PyAV: pip install av")
+        try:
+            reader = PyAVReader(source, size)
+        except (av.error.FFmpegError, IndexError):  # unreadable, or no video stream
+            yield None
+            return
+        try:
+            yield reader
+        finally:
+            reader.close()
+        return
+
+    with open_capture(source) as cap:
+        yield OpenCVReader(cap, size) if cap.isOpened() else None
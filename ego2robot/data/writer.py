@@ -0,0 +1,141 @@
+"""
+Write-behind file output: saves run on background threads so decoding and
+inference don't wait on compression and disk.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+
+
+def fsync_file(path):
+    """Flush a finished file to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path, write, fsync):
+    """Write via a temp file renamed into place, so readers never see a partial file."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        write(f)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def save_array(path, array, fsync=False):
+    """np.save to exactly `path`, atomically."""
+    _atomic_write(path, lambda f: np.save(f, array), fsync)
+
+
+def save_arrays_compressed(path, arrays, fsync=False):
+    """np.savez_compressed to exactly `path`, atomically."""
+    _atomic_write(path, lambda f: np.savez_compressed(f, **arrays), fsync)
+
+
+class AsyncWriter:
+    """
+    Bounded write-behind queue over a thread pool.
+    submit() returns a Future and blocks once max_pending writes are in
+    flight, so a fast producer can't pile up unwritten buffers in memory.
+    flush() waits for everything and re-raises the first failed write.
+    num_threads=0 runs each write immediately on the caller's thread.
+    """
+
+    def __init__(self, num_threads=2, max_pending=8):
+        self.num_threads = num_threads
+        self._executor = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix='writer') if num_threads else None
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._errors = []
+
+        self.num_written = 0
+        self.wait_seconds = 0.0  # time submit() spent blocked on a full queue
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); returns a Future for its result."""
+        if self._executor is None:
+            future = _completed(fn, *args, **kwargs)
+            self._finished(future)
+            return future
+
+        if not self._slots.acquire(blocking=False):
+            start = time.perf_counter()
+            self._slots.acquire()
+            self.wait_seconds += time.perf_counter() - start
+
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._lock:
+            if future in self._pending:
+                self._pending.discard(future)
+                self._slots.release()
+            if future.exception() is not None:
+                self._errors.append(future.exception())
+            else:
+                self.num_written += 1
+
+    def flush(self, raise_errors=True):
+        """
+        Wait for every queued write; raises the first error any of them hit
+        (unless raise_errors is False, for callers checking their futures).
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            for future in pending:
+                future.exception()  # waits without raising
+
+        with self._lock:
+            errors, self._errors = self._errors, []
+        if errors and raise_errors:
+            raise errors[0]
+
+    def close(self, raise_errors=True):
+        """Flush, then stop the threads."""
+        try:
+            self.flush(raise_errors)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            return
+        # Already failing: still finish what was queued, but keep the original error
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _completed(fn, *args, **kwargs):
+    """Run fn now; a done Future with its result or exception."""
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
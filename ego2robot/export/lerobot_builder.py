@@ -4,6 +4,7 @@ import json
 import os
 from pathlib import Path
 import shutil
+from ego2robot.data.writer import AsyncWriter, save_arrays_compressed
 
 class LeRobotEpisodeBuilder:
     def __init__(self, config, output_dir="data/lerobot_dataset"):
@@ -16,21 +17,29 @@ class LeRobotEpisodeBuilder:
         (self.output_dir / "videos").mkdir(exist_ok=True)
         (self.output_dir / "meta").mkdir(exist_ok=True)
         
+        # Episode files are compressed and written on background threads
+        output_cfg = config.get('output') or {}
+        self.write_threads = output_cfg.get('write_threads', 0)
+        self.write_queue = output_cfg.get('write_queue', 8)
+        self.fsync = output_cfg.get('fsync', False)
+        
     def build_episodes(self, clips_data):
         """
         Build LeRobot episodes from processed clips.
-        clips_data: list of dicts with frames, hand_tracks, actions, metadata
+        clips_data: list of dicts with frames, hand_tracks (HandTrack), actions, metadata
         """
         print(f"Building {len(clips_data)} episodes...")
         
         episodes_metadata = []
         
-        for ep_idx, clip in enumerate(clips_data):
-            episode_data = self._build_episode(ep_idx, clip)
-            episodes_metadata.append(episode_data)
-            
-            if (ep_idx + 1) % 10 == 0:
-                print(f"  Built {ep_idx + 1}/{len(clips_data)} episodes")
+        # Every episode file is on disk before info.json is written
+        with AsyncWriter(self.write_threads, self.write_queue) as writer:
+            for ep_idx, clip in enumerate(clips_data):
+                episode_data = self._build_episode(ep_idx, clip, writer)
+                episodes_metadata.append(episode_data)
+                
+                if (ep_idx + 1) % 10 == 0:
+                    print(f"  Built {ep_idx + 1}/{len(clips_data)} episodes")
         
         # Create info.json
         self._create_info_json(episodes_metadata)
@@ -40,62 +49,37 @@ class LeRobotEpisodeBuilder:
         
         return str(self.output_dir)
     
-    def _build_episode(self, ep_idx, clip):
-        """Build single episode."""
+    def _build_episode(self, ep_idx, clip, writer=None):
+        """Build single episode; saved through writer (an AsyncWriter) if given."""
         frames = clip['frames']
         hand_tracks = clip['hand_tracks']
         actions = clip['actions']
         metadata = clip['metadata']
         
         num_frames = len(frames)
+        frame_index = np.arange(num_frames)
+        
+        # Observation: state (first hand's bbox normalized to [0, 1]; zero when not visible)
+        state = hand_tracks.bboxes[:, 0] / [640.0, 360.0, 640.0, 360.0]
         
-        # Create episode dict
         episode = {
-            'observation.images.top': [],
-            'observation.state': [],
-            'action': [],
-            'episode_index': [],
-            'frame_index': [],
-            'timestamp': [],
-            'next.done': [],
-            'index': [],
+            'observation.images.top': np.asarray(frames),
+            'observation.state': state,  # float64, as before
+            'action': np.asarray(actions),  # 2D hand motion
+            'episode_index': np.full(num_frames, ep_idx),
+            'frame_index': frame_index,
+            'timestamp': frame_index / 6.0,  # 6 fps
+            'next.done': frame_index == num_frames - 1,
+            'index': ep_idx * 1000 + frame_index,  # Global index
         }
         
-        for frame_idx in range(num_frames):
-            # Observation: image
-            episode['observation.images.top'].append(frames[frame_idx])
-            
-            # Observation: state (hand bbox normalized to [0, 1])
-            hand = hand_tracks[frame_idx]
-            if hand['visible']:
-                bbox_norm = [
-                    hand['bbox'][0] / 640.0,  # x_min
-                    hand['bbox'][1] / 360.0,  # y_min
-                    hand['bbox'][2] / 640.0,  # x_max
-                    hand['bbox'][3] / 360.0,  # y_max
-                ]
-            else:
-                bbox_norm = [0.0, 0.0, 0.0, 0.0]
-            
-            episode['observation.state'].append(bbox_norm)
-            
-            # Action: 2D hand motion
-            episode['action'].append(actions[frame_idx])
-            
-            # Metadata
-            episode['episode_index'].append(ep_idx)
-            episode['frame_index'].append(frame_idx)
-            episode['timestamp'].append(frame_idx / 6.0)  # 6 fps
-            episode['next.done'].append(frame_idx == num_frames - 1)
-            episode['index'].append(ep_idx * 1000 + frame_idx)  # Global index
-        
         # Save as numpy arrays
         episode_file = self.output_dir / "data" / f"episode_{ep_idx:06d}.npz"
         
-        np.savez_compressed(
-            episode_file,
-            **{k: np.array(v) for k, v in episode.items()}
-        )
+        if writer is None:
+            save_arrays_compressed(str(episode_file), episode, self.fsync)
+        else:
+            writer.submit(save_arrays_compressed, str(episode_file), episode, self.fsync)
         
         return {
             'episode_index': ep_idx,
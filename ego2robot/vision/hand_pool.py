@@ -0,0 +1,78 @@
+"""
+Run MediaPipe Hands on a process pool, one graph per worker.
+"""
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+from ego2robot.data.parallel import SharedClip, free_block
+from ego2robot.vision.hands import create_hands, detect_frames
+
+_worker_hands = None
+
+
+def _init_worker():
+    global _worker_hands
+    cv2.setNumThreads(1)  # one inference thread per process
+    _worker_hands = create_hands()
+
+
+def _detect_in_worker(handle):
+    """Detect hands in a shared-memory frame stack; returns (landmarks, visible)."""
+    shm, frames = handle.attach()
+    try:
+        return detect_frames(_worker_hands, frames)
+    finally:
+        del frames
+        shm.close()
+
+
+class HandDetectionPool:
+    """
+    MediaPipe solutions can't be shared across threads, so each worker
+    process owns its own Hands graph. Frames go to workers through shared
+    memory; landmarks (T, 2, 21, 3) and visibility (T, 2) come back.
+    A frame stack is always processed by one worker, from a reset graph
+    (whichever worker is free takes it, so any state left in its graph
+    belongs to an unrelated stack). Results match a single HandDetector.
+    """
+
+    def __init__(self, config, num_workers=None):
+        self.config = config
+        self.num_workers = (num_workers or (config.get('quality') or {}).get('hand_workers')
+                            or multiprocessing.cpu_count())
+
+        # Forking a process that already runs a MediaPipe graph crashes the
+        # child, so workers are always spawned
+        context = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=context,
+            initializer=_init_worker
+        )
+
+    def submit(self, frames):
+        """Queue a (T, H, W, 3) BGR frame stack; returns a future of (landmarks, visible)."""
+        handle, shm = SharedClip.from_array(frames)
+        future = self._pool.submit(_detect_in_worker, handle)
+        future.add_done_callback(lambda _: free_block(shm))
+        return future
+
+    def detect(self, frames):
+        """Blocking submit()."""
+        return self.submit(frames).result()
+
+    def map(self, frame_stacks):
+        """Yield (landmarks, visible) per frame stack, in order, keeping every worker busy."""
+        pending = deque()
+        for frames in frame_stacks:
+            pending.append(self.submit(frames))
+            if len(pending) >= 2 * self.num_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def close(self):
+        self._pool.shutdown()
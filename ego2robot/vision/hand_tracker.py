@@ -1,103 +1,212 @@
 """Extract hand trajectories from clips."""
-import mediapipe as mp
 import cv2
 import numpy as np
+from ego2robot.vision.hands import MAX_HANDS, NUM_LANDMARKS, create_hands, detect_frames, load_hand_cache
 
 class HandTracker:
-    def __init__(self, config):
+    def __init__(self, config, pool=None):
+        """pool: optional HandDetectionPool to run MediaPipe in worker processes."""
         self.config = config
-        mp_hands = mp.solutions.hands
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
+        self.pool = pool
+        self.hands = create_hands() if pool is None else None
         
-    def track_hands(self, frames):
+        # "keyframe": MediaPipe every keyframe_interval frames, Lucas-Kanade in between
+        tracking_cfg = config.get('tracking') or {}
+        self.mode = tracking_cfg.get('mode', 'full')
+        self.keyframe_interval = tracking_cfg.get('keyframe_interval', 6)
+        self.min_track_quality = tracking_cfg.get('min_track_quality', 0.6)
+        
+        # Frames answered from saved landmarks / run through MediaPipe / followed by optical flow
+        self.frames_reused = 0
+        self.frames_inferred = 0
+        self.frames_tracked = 0
+        
+    def track_hands(self, frames, cached=None):
         """
         Track hands across frames.
-        Returns: list of hand data per frame
+        cached: landmarks saved by ClipStorage (dict or path to the _hands.npz);
+        only frames it doesn't cover are run through MediaPipe.
+        Returns: HandTrack for the clip
         """
-        hand_tracks = []
+        frames = np.asarray(frames)
+        landmarks = np.zeros((len(frames), MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32)
+        visible = np.zeros((len(frames), MAX_HANDS), dtype=bool)
+        done = np.zeros(len(frames), dtype=bool)
+        
+        if cached is not None:
+            if isinstance(cached, str):
+                cached = load_hand_cache(cached)
+            indices = cached['frame_indices']
+            landmarks[indices] = cached['landmarks']
+            visible[indices] = cached['visible']
+            done[indices] = True
         
-        for frame in frames:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(frame_rgb)
+        if self.mode == 'keyframe':
+            self._track_keyframes(frames, landmarks, visible, done)
+        else:
+            missing = np.flatnonzero(~done)
+            if len(missing):
+                landmarks[missing], visible[missing] = self._detect(frames[missing])
             
-            if results.multi_hand_landmarks and len(results.multi_hand_landmarks) > 0:
-                # Get first hand
-                hand_landmarks = results.multi_hand_landmarks[0]
-                
-                # Get wrist position (landmark 0) as proxy for hand position
-                h, w = frame.shape[:2]
-                wrist = hand_landmarks.landmark[0]
-                
-                hand_data = {
-                    'x': wrist.x * w,
-                    'y': wrist.y * h,
-                    'visible': True,
-                    'bbox': self._get_bbox(hand_landmarks, h, w)
-                }
+            self.frames_reused += len(frames) - len(missing)
+            self.frames_inferred += len(missing)
+        
+        h, w = frames.shape[1:3]
+        return HandTrack(landmarks, visible, (h, w))
+    
+    def _detect(self, frames):
+        """MediaPipe landmarks (T, 2, 21, 3) and visible (T, 2) for these frames, from a reset graph."""
+        if self.pool is not None:
+            return self.pool.detect(frames)
+        return detect_frames(self.hands, frames)
+    
+    def _track_keyframes(self, frames, landmarks, visible, done):
+        """
+        Fill in frames not covered by `done`: MediaPipe on keyframes, optical
+        flow from the previous frame otherwise. Falls back to MediaPipe on any
+        frame where tracking quality drops below min_track_quality.
+        """
+        since_key = self.keyframe_interval  # first unknown frame is a keyframe
+        prev_gray = None
+        
+        for t, frame in enumerate(frames):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            # Frames since the last keyframe (or saved frame), counting this one
+            since_key += 1
+            between_keys = since_key < self.keyframe_interval and prev_gray is not None
+            
+            if done[t]:
+                self.frames_reused += 1
+                since_key = 0
+            elif between_keys and not visible[t - 1].any():
+                # No hand at the last frame: stays absent until the next keyframe
+                self.frames_tracked += 1
             else:
-                # Hand not visible
-                hand_data = {
-                    'x': -1,
-                    'y': -1,
-                    'visible': False,
-                    'bbox': [0, 0, 0, 0]
-                }
+                tracked = None
+                if between_keys:
+                    tracked = self._propagate(prev_gray, gray, landmarks[t - 1], visible[t - 1])
+                
+                if tracked is not None:
+                    landmarks[t] = tracked
+                    visible[t] = visible[t - 1]
+                    self.frames_tracked += 1
+                else:
+                    # Each keyframe is detected on its own, so a pool worker's
+                    # graph state (from another clip) can't leak in
+                    landmarks[t:t + 1], visible[t:t + 1] = self._detect(frames[t:t + 1])
+                    self.frames_inferred += 1
+                    since_key = 0
             
-            hand_tracks.append(hand_data)
-        
-        return hand_tracks
+            prev_gray = gray
     
-    def _get_bbox(self, hand_landmarks, h, w):
-        """Get bounding box for hand."""
-        x_coords = [lm.x * w for lm in hand_landmarks.landmark]
-        y_coords = [lm.y * h for lm in hand_landmarks.landmark]
+    def _propagate(self, prev_gray, gray, prev_landmarks, prev_visible):
+        """
+        Move each visible hand's landmarks by the median Lucas-Kanade flow of
+        corners inside its bbox. Returns new landmarks, or None if for any
+        hand too few corners survive the forward-backward check or the moved
+        box no longer matches the old one.
+        """
+        h, w = gray.shape
+        scale = np.array([w, h], dtype=np.float32)
+        landmarks = prev_landmarks.copy()
+        
+        for i in np.flatnonzero(prev_visible):
+            points = prev_landmarks[i, :, :2] * scale
+            x0, y0 = np.maximum(points.min(axis=0) - 8, 0).astype(int)
+            x1, y1 = np.minimum(points.max(axis=0) + 8, [w - 1, h - 1]).astype(int)
+            if x1 - x0 < 8 or y1 - y0 < 8:
+                return None
+            
+            corners = cv2.goodFeaturesToTrack(prev_gray[y0:y1, x0:x1], maxCorners=30,
+                                              qualityLevel=0.01, minDistance=4)
+            if corners is None or len(corners) < 6:
+                return None
+            corners = corners + np.array([x0, y0], dtype=np.float32)
+            
+            moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, corners, None,
+                                                        winSize=(15, 15), maxLevel=2)
+            back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, prev_gray, moved, None,
+                                                            winSize=(15, 15), maxLevel=2)
+            error = np.linalg.norm((corners - back).reshape(-1, 2), axis=1)
+            good = (status.ravel() == 1) & (back_status.ravel() == 1) & (error < 1.0)
+            
+            if good.mean() < self.min_track_quality:
+                return None
+            
+            shift = np.median((moved - corners).reshape(-1, 2)[good], axis=0)
+            
+            # The flow can lock onto background once a hand leaves; the moved
+            # box must still look like the hand
+            dx, dy = np.round(shift).astype(int)
+            if not (0 <= x0 + dx and x1 + dx < w and 0 <= y0 + dy and y1 + dy < h):
+                return None
+            similarity = cv2.matchTemplate(gray[y0 + dy:y1 + dy, x0 + dx:x1 + dx],
+                                           prev_gray[y0:y1, x0:x1], cv2.TM_CCOEFF_NORMED)[0, 0]
+            if similarity < self.min_track_quality:
+                return None
+            
+            landmarks[i, :, :2] += shift / scale
         
-        return [
-            min(x_coords),
-            min(y_coords),
-            max(x_coords),
-            max(y_coords)
-        ]
+        return landmarks
     
     def compute_hand_motion(self, hand_tracks):
         """
-        Compute 2D hand motion vectors (pseudo-actions).
+        Compute 2D hand motion vectors (pseudo-actions) from a HandTrack.
         Returns: array of (delta_x, delta_y) normalized to [-1, 1]
         """
-        actions = []
+        if len(hand_tracks) < 2:
+            return np.zeros((1, 2), dtype=np.float32)
         
-        for i in range(len(hand_tracks) - 1):
-            curr = hand_tracks[i]
-            next_hand = hand_tracks[i + 1]
-            
-            if curr['visible'] and next_hand['visible']:
-                # Compute motion
-                delta_x = next_hand['x'] - curr['x']
-                delta_y = next_hand['y'] - curr['y']
-                
-                # Normalize by image dimensions (360 x 640)
-                delta_x_norm = delta_x / 640.0
-                delta_y_norm = delta_y / 360.0
-                
-                # Clip to [-1, 1]
-                delta_x_norm = np.clip(delta_x_norm, -1.0, 1.0)
-                delta_y_norm = np.clip(delta_y_norm, -1.0, 1.0)
-            else:
-                # Hand not visible - zero action
-                delta_x_norm = 0.0
-                delta_y_norm = 0.0
-            
-            actions.append([delta_x_norm, delta_y_norm])
+        # First hand's wrist; zero action unless it is visible in both frames
+        wrist = hand_tracks.wrist[:, 0]
+        visible = hand_tracks.visible[:, 0]
+        both = visible[:-1] & visible[1:]
+        
+        # Normalize by image dimensions (360 x 640) and clip to [-1, 1]
+        deltas = np.clip(np.diff(wrist, axis=0) / [640.0, 360.0], -1.0, 1.0)
+        deltas[~both] = 0.0
         
         # Add last action (repeat previous)
-        if actions:
-            actions.append(actions[-1])
-        else:
-            actions.append([0.0, 0.0])
+        actions = np.concatenate([deltas, deltas[-1:]])
+        return actions.astype(np.float32)
+
+
+class HandTrack:
+    """
+    Hand tracking result for one clip as arrays:
+    landmarks (T, 2, 21, 3) normalized, visible (T, 2), bboxes (T, 2, 4) in
+    pixels (zero where the hand isn't visible). Indexing a frame still gives
+    the old per-frame dict for the first hand.
+    """
+    
+    def __init__(self, landmarks, visible, frame_size):
+        self.landmarks = landmarks
+        self.visible = visible
+        self.frame_size = frame_size  # (h, w)
         
-        return np.array(actions, dtype=np.float32)
\ No newline at end of file
+        h, w = frame_size
+        points = landmarks[..., :2].astype(np.float64) * [w, h]
+        self.bboxes = np.concatenate([points.min(axis=2), points.max(axis=2)], axis=-1)
+        self.bboxes[~visible] = 0.0
+    
+    @property
+    def wrist(self):
+        """Wrist (landmark 0) pixel positions, (T, 2, 2); -1 where not visible."""
+        h, w = self.frame_size
+        wrist = self.landmarks[:, :, 0, :2].astype(np.float64) * [w, h]
+        wrist[~self.visible] = -1
+        return wrist
+    
+    def __len__(self):
+        return len(self.visible)
+    
+    def __getitem__(self, t):
+        """Per-frame dict for the first hand (x, y, visible, bbox)."""
+        if not self.visible[t, 0]:
+            return {'x': -1, 'y': -1, 'visible': False, 'bbox': [0, 0, 0, 0]}
+        h, w = self.frame_size
+        x, y = self.landmarks[t, 0, 0, :2].astype(np.float64) * [w, h]  # this frame's wrist only
+        return {'x': float(x), 'y': float(y), 'visible': True, 'bbox': self.bboxes[t, 0].tolist()}
+    
+    def __iter__(self):
+        return (self[t] for t in range(len(self)))
@@ -1,37 +1,213 @@
 """Hand detection and tracking."""
+import math
 import mediapipe as mp
 import cv2
 import numpy as np
 
+MAX_HANDS = 2
+NUM_LANDMARKS = 21
+
+
+def create_hands():
+    """The MediaPipe Hands graph every detector and tracker uses."""
+    return mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=MAX_HANDS,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+def hand_arrays(results):
+    """
+    MediaPipe results for one frame as arrays:
+    landmarks (2, 21, 3) normalized x, y, z (zeros for missing hands),
+    visible (2,) bool. Hands keep MediaPipe's order.
+    """
+    landmarks = np.zeros((MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32)
+    visible = np.zeros(MAX_HANDS, dtype=bool)
+    
+    for i, hand in enumerate((results.multi_hand_landmarks or [])[:MAX_HANDS]):
+        landmarks[i] = [(lm.x, lm.y, lm.z) for lm in hand.landmark]
+        visible[i] = True
+    
+    return landmarks, visible
+
+
+def detect_frames(hands, frames, reset=True):
+    """
+    Run a Hands graph over a sequence of BGR frames, tracking from a fresh
+    start (reset=False continues from the graph's current state).
+    Returns landmarks (T, 2, 21, 3) and visible (T, 2).
+    """
+    # Clips are unrelated, so don't carry tracking state over from the last one
+    if reset:
+        hands.reset()
+    
+    landmarks = np.zeros((len(frames), MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32)
+    visible = np.zeros((len(frames), MAX_HANDS), dtype=bool)
+    
+    for t, frame in enumerate(frames):
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        landmarks[t], visible[t] = hand_arrays(results)
+    
+    return landmarks, visible
+
+
+def load_hand_cache(path):
+    """
+    Landmarks saved next to a clip by ClipStorage: dict of frame_indices (N,),
+    landmarks (N, 2, 21, 3) and visible (N, 2) for the frames detected.
+    """
+    with np.load(path) as data:
+        return {key: data[key] for key in ('frame_indices', 'landmarks', 'visible')}
+
+
+def spread_order(n):
+    """0..n-1 in bit-reversed order (0, n/2, n/4, 3n/4, ...): every prefix is spread over the clip."""
+    bits = max(1, (n - 1).bit_length())
+    order = [int(format(i, f'0{bits}b')[::-1], 2) for i in range(1 << bits)]
+    return np.array([i for i in order if i < n], dtype=int)
+
+
+def _hypergeom_cdf(k, population, successes, draws):
+    """P(X <= k) for X hits in draws taken without replacement."""
+    total = math.comb(population, draws)
+    return sum(
+        math.comb(successes, i) * math.comb(population - successes, draws - i)
+        for i in range(0, k + 1)
+    ) / total
+
+
+def visibility_decision(hits, seen, total, threshold, mode='certain', risk=0.05):
+    """
+    Whether hits/total >= threshold is settled after seeing `seen` of
+    `total` frames: True (passes), False (fails) or None (keep going).
+    'certain': the remaining frames can't change the outcome.
+    'likely': a clip just on the other side of the threshold would show
+    these counts with probability below risk (exact, sampling without
+    replacement).
+    """
+    needed = math.ceil(threshold * total - 1e-9)  # hits for the full clip to pass
+    remaining = total - seen
+    
+    if hits >= needed:
+        return True
+    if hits + remaining < needed:
+        return False
+    if mode != 'likely' or seen == 0:
+        return None
+    
+    # Fewest hits that would still pass: how unlikely are this few hits?
+    if _hypergeom_cdf(hits, total, needed, seen) < risk:
+        return False
+    # Most hits that would still fail: how unlikely are this many?
+    if needed >= 1 and 1.0 - _hypergeom_cdf(hits - 1, total, needed - 1, seen) < risk:
+        return True
+    return None
+
+
 class HandDetector:
-    def __init__(self, config):
+    def __init__(self, config, pool=None):
+        """pool: optional HandDetectionPool to run MediaPipe in worker processes."""
         self.config = config
-        mp_hands = mp.solutions.hands
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        
-    def process_clip(self, frames):
-        """Process clip and return hand info."""
-        hand_data = []
+        self.pool = pool
+        self.hands = create_hands() if pool is None else None
+        
+        # Stop sampling once the visibility threshold outcome is settled
+        self.early_stop = config['clips'].get('hand_early_stop')
+        self.early_stop_risk = config['clips'].get('hand_early_stop_risk', 0.05)
+        self.early_stop_batch = config['clips'].get('hand_early_stop_batch', 2)
+        
+    def process_clip(self, frames, threshold=None):
+        """
+        Process clip and return hand info.
+        'landmarks' holds the per-frame results so later stages can reuse them.
+        threshold: visibility the early-stopping mode decides against
+        (default clips.min_hand_visibility)
+        """
+        if self.early_stop:
+            if threshold is None:
+                threshold = self.config['clips']['min_hand_visibility']
+            return self._process_clip_early(frames, threshold)
         
         # Sample every 3rd frame for speed
-        for frame in frames[::3]:
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(frame_rgb)
+        frame_indices = np.arange(0, len(frames), 3)
+        landmarks, visible = self.detect(frames[::3])
+        
+        info = self._summary(visible)
+        info['landmarks'] = {
+            'frame_indices': frame_indices,
+            'landmarks': landmarks,
+            'visible': visible
+        }
+        return info
+    
+    def _process_clip_early(self, frames, threshold):
+        """
+        Same every-3rd-frame sample, taken in spread-out order and stopped
+        as soon as visibility_decision settles it. visibility_score is then
+        the fraction over the frames processed.
+        """
+        candidates = np.arange(0, len(frames), 3)
+        order = candidates[spread_order(len(candidates))]
+        
+        landmarks, visible = [], []
+        hits = seen = 0
+        decision = None
+        
+        for start in range(0, len(order), self.early_stop_batch):
+            batch = order[start:start + self.early_stop_batch]
+            # Every batch starts from a reset graph, so a pool worker's
+            # leftover state can't change the result
+            batch_landmarks, batch_visible = self.detect(frames[batch])
+            landmarks.append(batch_landmarks)
+            visible.append(batch_visible)
             
-            if results.multi_hand_landmarks:
-                hand_data.append(True)
-            else:
-                hand_data.append(False)
+            hits += int(batch_visible.any(axis=1).sum())
+            seen += len(batch)
+            decision = visibility_decision(hits, seen, len(order), threshold,
+                                           self.early_stop, self.early_stop_risk)
+            if decision is not None:
+                break
         
-        visibility = sum(hand_data) / len(hand_data) if hand_data else 0.0
+        processed = order[:seen]
+        by_frame = np.argsort(processed)
+        visible = np.concatenate(visible)[by_frame] if visible else np.zeros((0, MAX_HANDS), dtype=bool)
+        landmarks = (np.concatenate(landmarks)[by_frame] if landmarks
+                     else np.zeros((0, MAX_HANDS, NUM_LANDMARKS, 3), dtype=np.float32))
+        
+        info = self._summary(visible)
+        if decision is not None:
+            # A 'likely' call can disagree with the partial fraction; keep the decision
+            score = info['visibility_score']
+            info['visibility_score'] = max(score, threshold) if decision else min(score, np.nextafter(threshold, 0))
+        info['decided_early'] = seen < len(order)
+        info['frames_processed'] = seen
+        info['candidate_frames'] = len(order)
+        info['landmarks'] = {
+            'frame_indices': processed[by_frame],
+            'landmarks': landmarks,
+            'visible': visible
+        }
+        return info
+    
+    def detect(self, frames):
+        """landmarks (T, 2, 21, 3) and visible (T, 2) for every frame given, tracked from a reset graph."""
+        if self.pool is not None:
+            return self.pool.detect(frames)
+        return detect_frames(self.hands, frames)
+    
+    def _summary(self, visible):
+        hand_data = visible.any(axis=1)
+        visibility = hand_data.mean() if len(hand_data) else 0.0
         
         return {
-            'visibility_score': visibility,
-            'frames_with_hands': sum(hand_data),
-            'total_frames': len(hand_data)
-        }
\ No newline at end of file
+            'visibility_score': float(visibility),
+            'frames_with_hands': int(hand_data.sum()),
+            'total_frames': len(hand_data),
+            'decided_early': False,
+            'frames_processed': len(hand_data),
+            'candidate_frames': len(hand_data)
+        }
+
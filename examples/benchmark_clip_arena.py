@@ -0,0 +1,82 @@
+"""Cold-cache scans over one .npy per clip vs. a single memory-mapped clip arena."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+import glob
+import time
+import tempfile
+import numpy as np
+import yaml
+from ego2robot.data.storage import ClipStorage, close_arenas, load_frames
+
+# Load config
+with open('config/default.yaml') as f:
+    config = yaml.safe_load(f)
+
+H, W = config['processing']['target_resolution']
+T = 36
+NUM_CLIPS = 24
+
+print("="*60)
+print("CLIP ARENA BENCHMARK")
+print("="*60)
+
+
+def drop_cache(paths):
+    """Evict files from the page cache so the next read goes to disk."""
+    close_arenas()  # mapped pages can't be evicted
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        os.close(fd)
+
+
+def full_scan(manifest, buffer):
+    """Every frame of every clip, as the export does."""
+    for c in manifest:
+        buffer[...] = load_frames(c['frames_path'])
+
+
+def sparse_scan(manifest, buffer):
+    """16 evenly spaced frames per clip, as the VideoMAE embedder samples."""
+    indices = np.linspace(0, T - 1, 16, dtype=int)
+    for c in manifest:
+        buffer[:16] = load_frames(c['frames_path'])[indices]
+
+
+rng = np.random.default_rng(0)
+clip = {'frames': rng.integers(0, 255, (T, H, W, 3), dtype=np.uint8)}
+print(f"{NUM_CLIPS} clips of {T}x{H}x{W}x3 ({clip['frames'].nbytes * NUM_CLIPS / 1e9:.2f} GB per format)")
+
+print(f"\n{'format':<7} {'files':>6} {'write':>8} {'cold full':>10} {'warm full':>10} {'cold sparse':>12}")
+for fmt in ['npy', 'arena']:
+    cfg = copy.deepcopy(config)
+    cfg['output'].update(local_dir=tempfile.mkdtemp(), format=fmt)
+    storage = ClipStorage(cfg)
+
+    start = time.perf_counter()
+    manifest = [storage.save_clip(clip) for _ in range(NUM_CLIPS)]
+    storage.close()
+    write_s = time.perf_counter() - start
+
+    data_files = [path for path in glob.glob(os.path.join(cfg['output']['local_dir'], '*'))
+                  if not path.endswith('.json')]
+
+    buffer = np.empty_like(clip['frames'])
+    timings = []
+    for scan, cold in [(full_scan, True), (full_scan, False), (sparse_scan, True)]:
+        if cold:
+            drop_cache(data_files)
+        start = time.perf_counter()
+        scan(manifest, buffer)
+        timings.append(time.perf_counter() - start)
+
+    print(f"{fmt:<7} {len(data_files):>6} {write_s:>7.2f}s {timings[0]:>9.2f}s {timings[1]:>9.2f}s {timings[2]:>11.2f}s")
+
+    for path in data_files:
+        os.unlink(path)
+
+print("\n✓ Benchmark complete")
@@ -0,0 +1,74 @@
+"""Disk size, write/read time and fidelity of each ClipStorage output format."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+import time
+import tempfile
+import cv2
+import numpy as np
+import yaml
+from ego2robot.data.storage import VIDEO_FORMATS, ClipReader, ClipStorage, load_frames
+
+# Load config
+with open('config/default.yaml') as f:
+    config = yaml.safe_load(f)
+
+H, W = config['processing']['target_resolution']
+T = 36
+NUM_CLIPS = 4
+
+print("="*60)
+print("CLIP STORAGE BENCHMARK")
+print("="*60)
+
+# Camera panning over a textured scene with a moving object, plus sensor noise
+rng = np.random.default_rng(0)
+scene = cv2.GaussianBlur(rng.integers(0, 255, (H, W * 2, 3), dtype=np.uint8), (0, 0), 3)
+clips = []
+for c in range(NUM_CLIPS):
+    frames = np.empty((T, H, W, 3), dtype=np.uint8)
+    for t in range(T):
+        x = (c * 97 + t * 4) % W
+        frame = scene[:, x:x + W].copy()
+        cv2.circle(frame, (100 + t * 12, 180 + c * 20), 40, (40, 160, 220), -1)
+        noise = rng.integers(-3, 4, frame.shape)
+        frames[t] = np.clip(frame.astype(int) + noise, 0, 255)
+    clips.append({'frames': frames})
+
+raw_mb = sum(clip['frames'].nbytes for clip in clips) / 1e6
+print(f"{NUM_CLIPS} clips of {T}x{H}x{W}x3, {raw_mb:.1f} MB raw")
+
+print(f"\n{'format':<7} {'MB/clip':>8} {'ratio':>6} {'write':>8} {'load':>8} {'random':>9} {'max err':>8} {'psnr':>6}")
+for fmt in ['npy'] + list(VIDEO_FORMATS):
+    cfg = copy.deepcopy(config)
+    cfg['output'].update(local_dir=tempfile.mkdtemp(), format=fmt)
+    storage = ClipStorage(cfg)
+
+    start = time.perf_counter()
+    paths = [storage.save_clip(clip)['frames_path'] for clip in clips]
+    write_s = (time.perf_counter() - start) / NUM_CLIPS
+    stored_mb = sum(os.path.getsize(path) for path in paths) / 1e6
+
+    start = time.perf_counter()
+    loaded = [load_frames(path) for path in paths]
+    load_s = (time.perf_counter() - start) / NUM_CLIPS
+
+    # Scattered single frames, as a training loader would sample them
+    indices = rng.integers(0, T, 10)
+    start = time.perf_counter()
+    for path in paths:
+        with ClipReader(path) as reader:
+            for i in indices:
+                reader[int(i)]
+    random_ms = (time.perf_counter() - start) / (NUM_CLIPS * len(indices)) * 1000
+
+    error = max(np.abs(frames.astype(int) - clip['frames']).max() for frames, clip in zip(loaded, clips))
+    mse = np.mean([np.mean((frames.astype(float) - clip['frames']) ** 2) for frames, clip in zip(loaded, clips)])
+    psnr = f"{10 * np.log10(255 ** 2 / mse):>6.1f}" if mse else f"{'inf':>6}"
+
+    print(f"{fmt:<7} {stored_mb / NUM_CLIPS:>8.2f} {raw_mb / stored_mb:>5.1f}x {write_s * 1000:>6.0f}ms "
+          f"{load_s * 1000:>6.0f}ms {random_ms:>6.1f}ms {error:>8} {psnr}")
+
+print("\n✓ Benchmark complete")
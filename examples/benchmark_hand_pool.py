@@ -0,0 +1,62 @@
+"""Benchmark HandDetectionPool throughput against a single HandDetector."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multiprocessing
+import time
+import numpy as np
+import yaml
+from ego2robot.vision.hands import HandDetector
+from ego2robot.vision.hand_pool import HandDetectionPool
+
+NUM_CLIPS = 16
+
+
+def main():
+    # Load config
+    with open('config/default.yaml') as f:
+        config = yaml.safe_load(f)
+
+    h, w = config['processing']['target_resolution']
+    T = int(config['clips']['target_duration'] * config['processing']['target_fps'])
+
+    print("="*60)
+    print("HAND DETECTION POOL BENCHMARK")
+    print("="*60)
+
+    rng = np.random.default_rng(0)
+    clips = [rng.integers(0, 255, (T, h, w, 3), dtype=np.uint8) for _ in range(NUM_CLIPS)]
+    print(f"{NUM_CLIPS} clips of {T} x {w}x{h} ({len(clips[0][::3])} frames detected per clip)")
+
+    detector = HandDetector(config)
+    detector.process_clip(clips[0])  # warm up the graph
+
+    start = time.perf_counter()
+    expected = [detector.detect(clip[::3]) for clip in clips]
+    serial = NUM_CLIPS / (time.perf_counter() - start)
+
+    print(f"\n{'workers':<10} {'clips/s':>8} {'scaling':>8} {'matches':>8}")
+    print(f"{'serial':<10} {serial:>8.2f} {1.0:>7.2f}x {'-':>8}")
+
+    counts = sorted({1, 2, 4, multiprocessing.cpu_count()})
+    for num_workers in counts:
+        pool = HandDetectionPool(config, num_workers=num_workers)
+        list(pool.map(clip[::3] for clip in clips[:num_workers]))  # start every worker
+
+        start = time.perf_counter()
+        results = list(pool.map(clip[::3] for clip in clips))
+        rate = NUM_CLIPS / (time.perf_counter() - start)
+        pool.close()
+
+        matches = all(
+            np.array_equal(got[0], want[0]) and np.array_equal(got[1], want[1])
+            for got, want in zip(results, expected)
+        )
+        print(f"{num_workers:<10} {rate:>8.2f} {rate / serial:>7.2f}x {str(matches):>8}")
+
+    print(f"\n✓ Benchmark complete ({multiprocessing.cpu_count()} CPUs)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Manifest queries through ManifestStore's indexes vs. loading every record."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+import time
+import tempfile
+from ego2robot.data.manifest import ManifestStore
+
+NUM_CLIPS = 100_000
+LABELS = ['picking up an object', 'tightening a screw', 'operating machinery',
+          'assembling components together', 'wiping or cleaning a surface']
+
+print("="*60)
+print("MANIFEST QUERY BENCHMARK")
+print("="*60)
+
+rng = random.Random(0)
+records = [
+    {
+        'clip_id': f"clip_{i:06d}",
+        'frames_path': f"data/ego2robot_dataset/clip_{i:06d}.npy",
+        'shape': [36, 360, 640, 3],
+        'source_metadata': {'factory_id': f"factory_{rng.randrange(20):03d}",
+                            'worker_id': f"worker_{rng.randrange(200):03d}"},
+        'quality_scores': {'motion': rng.random(), 'hand_visibility': rng.random()},
+        'skill_cluster_id': rng.randrange(10),
+        'zero_shot_labels': {'top_label': rng.choice(LABELS), 'top_confidence': rng.random(),
+                             'all_scores': {label: rng.random() for label in LABELS}},
+    }
+    for i in range(NUM_CLIPS)
+]
+
+store = ManifestStore(os.path.join(tempfile.mkdtemp(), 'clips_manifest.db'))
+start = time.perf_counter()
+store.import_records(records)
+print(f"Imported {NUM_CLIPS} records in {time.perf_counter() - start:.1f}s")
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def scan_top50():
+    manifest = store.records()
+    return sorted(manifest, key=lambda c: c['quality_scores']['motion'] + c['quality_scores']['hand_visibility'],
+                  reverse=True)[:50]
+
+
+def scan_clusters():
+    manifest = store.records()
+    return {cid: len([c for c in manifest if c['skill_cluster_id'] == cid]) for cid in range(10)}
+
+
+def scan_factory():
+    manifest = store.records()
+    return [c for c in manifest
+            if c['source_metadata']['factory_id'] == 'factory_007' and c['quality_scores']['motion'] >= 0.9]
+
+
+ids = lambda clips: [c['clip_id'] for c in clips]
+cases = [
+    ("top 50 by quality", scan_top50, lambda: store.query(order_by=['-quality', 'seq'], limit=50), ids),
+    ("clips per cluster", scan_clusters,
+     lambda: {row['skill_cluster_id']: row['count'] for row in store.aggregate('skill_cluster_id')}, None),
+    ("factory + motion filter", scan_factory,
+     lambda: store.query({'factory_id': 'factory_007', 'motion': ('>=', 0.9)}), ids),
+]
+
+print(f"\n{'query':<24} {'load all + Python':>18} {'indexed':>10} {'speedup':>8} {'same':>5}")
+for name, scan, indexed, key in cases:
+    expected, scan_ms = timed(scan)
+    result, indexed_ms = timed(indexed)
+    same = (key(expected) == key(result)) if key else expected == result
+    print(f"{name:<24} {scan_ms:>16.0f}ms {indexed_ms:>8.1f}ms {scan_ms / indexed_ms:>7.0f}x {str(same):>5}")
+
+store.close()
+print("\n✓ Benchmark complete")
@@ -0,0 +1,99 @@
+"""Microbenchmark the batched MotionScorer against the per-frame loop it replaced."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import cv2
+import numpy as np
+import yaml
+from ego2robot.vision.motion import MotionScorer
+
+# Load config
+with open('config/default.yaml') as f:
+    config = yaml.safe_load(f)
+
+h, w = config['processing']['target_resolution']
+T = int(config['clips']['target_duration'] * config['processing']['target_fps'])
+NUM_CLIPS = 16
+REPEATS = 5
+
+print("="*60)
+print("MOTION SCORER BENCHMARK")
+print("="*60)
+
+def loop_score(frames):
+    """Previous implementation: per-frame lists and a Python diff loop."""
+    if len(frames) < 2:
+        return 0.0
+    frames_small = [cv2.resize(f, (160, 90)) for f in frames[::2]]
+    gray_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames_small]
+    diffs = []
+    for i in range(len(gray_frames) - 1):
+        diffs.append(cv2.absdiff(gray_frames[i], gray_frames[i+1]).mean())
+    return np.mean(diffs) / 255.0
+
+# Drifting noise so every clip has a different score
+rng = np.random.default_rng(0)
+base = rng.integers(0, 255, (h, w + T * 8, 3), dtype=np.uint8)
+clips = []
+for c in range(NUM_CLIPS):
+    step = c % 8
+    clips.append(np.stack([base[:, i * step:i * step + w] for i in range(T)]))
+print(f"{NUM_CLIPS} clips of {T} x {w}x{h}")
+
+
+def stack_scores(gray, counts):
+    """Per-clip mean frame-to-frame difference over a (N, 90, 160) grayscale stack."""
+    diffs = np.abs(np.diff(gray.reshape(len(gray), -1).astype(np.float32), axis=0)).mean(axis=1)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return np.array([diffs[start:start + count - 1].mean() / 255.0 for start, count in zip(starts, counts)])
+
+
+def one_resize_batch(clips):
+    """Downsample every sampled frame of the batch in one cv2.resize over the stacked frames."""
+    stack = np.concatenate([clip[::2] for clip in clips])
+    small = cv2.resize(stack.reshape(-1, w, 3), (160, len(stack) * 90))
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).reshape(-1, 90, 160)
+    return stack_scores(gray, [len(clip[::2]) for clip in clips])
+
+
+def gray_first_batch(clips):
+    """Grayscale the full-resolution stack, then one reshape + mean area reduction."""
+    stack = np.concatenate([clip[::2] for clip in clips])
+    gray = cv2.cvtColor(stack.reshape(-1, w, 3), cv2.COLOR_BGR2GRAY).reshape(len(stack), h, w)
+    small = gray.reshape(len(stack), 90, h // 90, 160, w // 160).mean(axis=(2, 4), dtype=np.float32)
+    return stack_scores(small, [len(clip[::2]) for clip in clips])
+
+
+scorer = MotionScorer(config)
+expected = np.array([loop_score(clip) for clip in clips])
+
+# (name, run, must match the loop): the last two are batched-downsample
+# alternatives score_clips doesn't use. A single resize has to copy the
+# strided frames[::2] first; a full-resolution grayscale pass touches every
+# pixel, and area averaging smooths fine texture that the linear resize
+# samples, so it also scores differently
+runs = [
+    ("per-frame loop (before)", lambda: [loop_score(clip) for clip in clips], True),
+    ("score_clip", lambda: [scorer.score_clip(clip) for clip in clips], True),
+    ("score_clips (batch)", lambda: scorer.score_clips(clips), True),
+    ("one resize for the batch", lambda: one_resize_batch(clips), False),
+    ("gray first + area mean", lambda: gray_first_batch(clips), False),
+]
+
+print(f"\n{'path':<26} {'ms/clip':>8} {'speedup':>8} {'max diff':>9}")
+baseline = None
+for name, run, must_match in runs:
+    scores = np.asarray(run(), dtype=float)
+    error = np.abs(scores - expected).max()
+    assert error < 1e-6 or not must_match, f"{name} scores differ from the loop by {error:.2e}"
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        run()
+    per_clip = (time.perf_counter() - start) / REPEATS / NUM_CLIPS * 1000
+    baseline = baseline or per_clip
+    print(f"{name:<26} {per_clip:>7.2f} {baseline / per_clip:>7.2f}x {error:>9.1e}")
+
+print("\n✓ Benchmark complete")
@@ -0,0 +1,96 @@
+"""Cross-check MotionVectorScorer against the pixel-difference MotionScorer."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import time
+import cv2
+import numpy as np
+import yaml
+from ego2robot.data.clips import ClipExtractor
+from ego2robot.data.video_io import av
+from ego2robot.vision.motion import MotionScorer, MotionVectorScorer
+
+if av is None:
+    print("PyAV not installed - pip install av")
+    sys.exit(1)
+
+# Load config
+with open('config/default.yaml') as f:
+    config = yaml.safe_load(f)
+
+FPS = 30
+SECONDS = 8
+H, W = 720, 1280
+SPEEDS = [0, 0.5, 1, 2, 4, 8, 16]  # pixels per frame
+
+print("="*60)
+print("MOTION VECTOR CROSS-CHECK")
+print("="*60)
+
+background = np.tile(np.linspace(40, 200, W, dtype=np.uint8), (H, 1))
+background = cv2.merge([background, background[::-1], background])
+
+def synthetic_video(speed):
+    """H.264 video of shapes drifting at `speed` px/frame over a slowly panning background."""
+    buffer = io.BytesIO()
+    with av.open(buffer, 'w', format='mp4') as container:
+        stream = container.add_stream('libx264', rate=FPS)
+        stream.width, stream.height, stream.pix_fmt = W, H, 'yuv420p'
+        for i in range(FPS * SECONDS):
+            frame = np.roll(background, int(i * speed / 4), axis=1)
+            for k in range(6):
+                x = int((160 + k * 194 + i * speed) % W)
+                y = int(120 + k * 90 + 40 * np.sin(i * speed / 40 + k))
+                cv2.circle(frame, (x, y), 60, (255 - 40 * k, 60 * k % 255, 200), -1)
+            for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format='bgr24')):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+    return buffer.getvalue()
+
+config['clips'].update(stride=1000.0)  # one 6 s window per video
+duration = config['clips']['target_duration']
+extractor = ClipExtractor(config)
+pixel_scorer = MotionScorer(config)
+mv_scorer = MotionVectorScorer(config)
+
+print(f"\n{'px/frame':>8} {'pixel':>8} {'vectors':>8} {'pixel time':>11} {'mv time':>8}")
+pixel_scores, mv_scores = [], []
+pixel_time = mv_time = 0.0
+for speed in SPEEDS:
+    video_bytes = synthetic_video(speed)
+
+    start = time.perf_counter()
+    clip = extractor.extract_clips(video_bytes, {})[0]
+    pixel = pixel_scorer.score_clip(clip['frames'])
+    pixel_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mv = mv_scorer.score_clip(video_bytes, 0.0, duration)
+    mv_elapsed = time.perf_counter() - start
+
+    pixel_scores.append(pixel)
+    mv_scores.append(mv)
+    pixel_time += pixel_elapsed
+    mv_time += mv_elapsed
+    print(f"{speed:>8} {pixel:>8.4f} {mv:>8.4f} {pixel_elapsed:>10.2f}s {mv_elapsed:>7.2f}s")
+
+pixel_scores = np.array(pixel_scores)
+mv_scores = np.array(mv_scores)
+ranks = lambda x: np.argsort(np.argsort(x))
+spearman = np.corrcoef(ranks(pixel_scores), ranks(mv_scores))[0, 1]
+pearson = np.corrcoef(pixel_scores, mv_scores)[0, 1]
+
+# Vector-score threshold matching min_motion_score, by linear fit
+slope, intercept = np.polyfit(pixel_scores, mv_scores, 1)
+min_motion = config['clips']['min_motion_score']
+
+print(f"\nSpearman rank correlation: {spearman:.3f}")
+print(f"Pearson correlation:       {pearson:.3f}")
+print(f"Equivalent of min_motion_score {min_motion}: {slope * min_motion + intercept:.4f} (vectors)")
+print(f"Vectors vs decode + pixels: {pixel_time / mv_time:.1f}x faster, "
+      f"{len(SPEEDS) * SECONDS / mv_time:.0f}x real time")
+
+print("\n✓ Cross-check complete")
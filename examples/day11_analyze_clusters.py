@@ -3,12 +3,10 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
-from collections import Counter
+from ego2robot.data.manifest import open_manifest
 
 # Load manifest
-with open('data/ego2robot_dataset/clips_manifest.json') as f:
-    manifest = json.load(f)
+store = open_manifest('data/ego2robot_dataset')
 
 print("="*60)
 print("CLUSTER ANALYSIS")
@@ -17,18 +15,22 @@ print("="*60)
 # Analyze each cluster
 cluster_names = {}
 
+# Size and mean scores of every cluster in one grouped query
+clusters = {
+    row['skill_cluster_id']: row
+    for row in store.aggregate('skill_cluster_id', avg_motion=('avg', 'motion'), avg_hands=('avg', 'hand_visibility'))
+}
+
 for cluster_id in range(10):
-    clips_in_cluster = [c for c in manifest if c['skill_cluster_id'] == cluster_id]
-    
-    if not clips_in_cluster:
+    if cluster_id not in clusters:
         continue
+    cluster = clusters[cluster_id]
     
-    # Get all top labels
-    labels = [c['zero_shot_labels']['top_label'] for c in clips_in_cluster]
-    label_counts = Counter(labels)
+    # Top-label counts, most common first
+    label_counts = store.aggregate('top_label', filters={'skill_cluster_id': cluster_id}, order_by='-count')
     
     # Get dominant label
-    dominant_label = label_counts.most_common(1)[0][0]
+    dominant_label = label_counts[0]['top_label']
     
     # Create short name
     name_map = {
@@ -48,25 +50,20 @@ for cluster_id in range(10):
     cluster_names[cluster_id] = cluster_name
     
     print(f"\nCluster {cluster_id}: {cluster_name}")
-    print(f"  Size: {len(clips_in_cluster)} clips")
+    print(f"  Size: {cluster['count']} clips")
     print(f"  Label distribution:")
-    for label, count in label_counts.most_common():
-        short_label = name_map.get(label, label)
-        print(f"    - {short_label}: {count}")
+    for row in label_counts:
+        short_label = name_map.get(row['top_label'], row['top_label'])
+        print(f"    - {short_label}: {row['count']}")
     
     # Show quality scores
-    motion_scores = [c['quality_scores']['motion'] for c in clips_in_cluster]
-    hand_scores = [c['quality_scores']['hand_visibility'] for c in clips_in_cluster]
-    print(f"  Avg motion: {sum(motion_scores)/len(motion_scores):.3f}")
-    print(f"  Avg hand vis: {sum(hand_scores)/len(hand_scores):.3f}")
-
-# Save cluster names to manifest
-for clip in manifest:
-    cluster_id = clip['skill_cluster_id']
-    clip['skill_cluster_name'] = cluster_names.get(cluster_id, f"Cluster {cluster_id}")
+    print(f"  Avg motion: {cluster['avg_motion']:.3f}")
+    print(f"  Avg hand vis: {cluster['avg_hands']:.3f}")
 
-with open('data/ego2robot_dataset/clips_manifest.json', 'w') as f:
-    json.dump(manifest, f, indent=2)
+# Save cluster names to manifest, one update per cluster
+for cluster_id in clusters:
+    store.update_where({'skill_cluster_id': cluster_id},
+                       skill_cluster_name=cluster_names.get(cluster_id, f"Cluster {cluster_id}"))
 
 print("\n" + "="*60)
 print("✓ Cluster names added to manifest")
@@ -75,5 +72,4 @@ print("="*60)
 # Summary
 print("\nCluster Summary:")
 for cluster_id, name in sorted(cluster_names.items()):
-    count = len([c for c in manifest if c['skill_cluster_id'] == cluster_id])
-    print(f"  {cluster_id}: {name} ({count} clips)")
\ No newline at end of file
+    print(f"  {cluster_id}: {name} ({clusters[cluster_id]['count']} clips)")
\ No newline at end of file
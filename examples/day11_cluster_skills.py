@@ -5,9 +5,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import yaml
 import numpy as np
-import json
 import matplotlib.pyplot as plt
 from ego2robot.skills.cluster import SkillClusterer
+from ego2robot.data.manifest import open_manifest
 
 # Create skills directory
 os.makedirs('ego2robot/skills', exist_ok=True)
@@ -16,8 +16,8 @@ open('ego2robot/skills/__init__.py', 'w').close()
 with open('config/default.yaml') as f:
     config = yaml.safe_load(f)
 
-with open('data/ego2robot_dataset/clips_manifest.json') as f:
-    manifest = json.load(f)
+store = open_manifest('data/ego2robot_dataset')
+manifest = store.records()
 
 print("="*60)
 print("SKILL CLUSTERING")
@@ -35,9 +35,9 @@ cluster_ids = clusterer.fit(embeddings)
 for i, clip_meta in enumerate(manifest):
     clip_meta['skill_cluster_id'] = int(cluster_ids[i])
 
-# Save
-with open('data/ego2robot_dataset/clips_manifest.json', 'w') as f:
-    json.dump(manifest, f, indent=2)
+# Save (only the new field is written)
+store.update_many((clip_meta['clip_id'], {'skill_cluster_id': clip_meta['skill_cluster_id']})
+                  for clip_meta in manifest)
 
 # Compute t-SNE
 tsne_coords = clusterer.compute_tsne(embeddings)
@@ -70,13 +70,11 @@ for cluster_id, count in zip(unique, counts):
 # Show sample labels per cluster
 print("\nSample labels per cluster:")
 for cluster_id in range(min(5, max(cluster_ids)+1)):
-    clips_in_cluster = [m for m, cid in zip(manifest, cluster_ids) if cid == cluster_id]
-    if clips_in_cluster:
+    samples = store.query({'skill_cluster_id': cluster_id}, limit=3, columns=['top_label', 'top_confidence'])
+    if samples:
         print(f"\nCluster {cluster_id}:")
-        for clip in clips_in_cluster[:3]:
-            label = clip['zero_shot_labels']['top_label']
-            conf = clip['zero_shot_labels']['top_confidence']
-            print(f"  - {label} ({conf:.2f})")
+        for clip in samples:
+            print(f"  - {clip['top_label']} ({clip['top_confidence']:.2f})")
 
 print("\n" + "="*60)
 print("CLUSTERING COMPLETE")
@@ -4,11 +4,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import yaml
-import json
 import numpy as np
 from tqdm import tqdm
 from ego2robot.vision.hand_tracker import HandTracker
 from ego2robot.export.lerobot_builder import LeRobotEpisodeBuilder
+from ego2robot.data.storage import load_frames
+from ego2robot.data.manifest import open_manifest
 
 # Create export directory
 os.makedirs('ego2robot/export', exist_ok=True)
@@ -19,21 +20,15 @@ with open('config/default.yaml') as f:
     config = yaml.safe_load(f)
 
 # Load manifest
-with open('data/ego2robot_dataset/clips_manifest.json') as f:
-    manifest = json.load(f)
+store = open_manifest('data/ego2robot_dataset')
 
 print("="*60)
 print("BUILDING LEROBOT DATASET")
 print("="*60)
-print(f"Total clips: {len(manifest)}")
+print(f"Total clips: {len(store)}")
 
-# Select 50 best clips (highest quality scores)
-manifest_sorted = sorted(
-    manifest,
-    key=lambda x: x['quality_scores']['motion'] + x['quality_scores']['hand_visibility'],
-    reverse=True
-)
-selected_clips = manifest_sorted[:50]
+# Select 50 best clips (highest motion + hand visibility), straight from the index
+selected_clips = store.query(order_by=['-quality', 'seq'], limit=50)  # ties keep save order
 
 print(f"Selected top 50 clips for LeRobot export")
 
@@ -46,10 +41,10 @@ clips_data = []
 
 for i, clip_meta in enumerate(tqdm(selected_clips, desc="Processing clips")):
     # Load frames
-    frames = np.load(clip_meta['frames_path'])
+    frames = load_frames(clip_meta['frames_path'])
     
-    # Track hands
-    hand_tracks = tracker.track_hands(frames)
+    # Track hands, reusing landmarks saved by the quality filter
+    hand_tracks = tracker.track_hands(frames, cached=clip_meta.get('hands_path'))
     
     # Compute actions
     actions = tracker.compute_hand_motion(hand_tracks)
@@ -75,5 +70,6 @@ print("\n" + "="*60)
 print("LEROBOT DATASET COMPLETE")
 print("="*60)
 print(f"Location: {dataset_path}")
+print(f"Hand frames reused: {tracker.frames_reused}, inferred: {tracker.frames_inferred}")
 print(f"Episodes: 50")
 print(f"Total frames: ~{50 * 36} (~1800)")
\ No newline at end of file
@@ -53,4 +53,5 @@ print(f"\n{'='*60}")
 print(f"TOTAL: {len(all_filtered_clips)} curated clips")
 print(f"{'='*60}")
 
-storage.save_clips(all_filtered_clips)
\ No newline at end of file
+storage.save_clips(all_filtered_clips)
+storage.close()
\ No newline at end of file
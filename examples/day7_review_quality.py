@@ -3,23 +3,25 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
 import numpy as np
 import matplotlib.pyplot as plt
+from ego2robot.data.manifest import open_manifest
+from ego2robot.data.storage import split_arena_ref
 
 # Load manifest
-with open('data/ego2robot_dataset/clips_manifest.json') as f:
-    manifest = json.load(f)
+store = open_manifest('data/ego2robot_dataset')
+num_clips = len(store)
 
 print("="*60)
 print("DATASET QUALITY REVIEW")
 print("="*60)
 
-print(f"\nTotal clips: {len(manifest)}")
+print(f"\nTotal clips: {num_clips}")
 
-# Analyze quality scores
-motion_scores = [c['quality_scores']['motion'] for c in manifest]
-hand_scores = [c['quality_scores']['hand_visibility'] for c in manifest]
+# Analyze quality scores (indexed columns, no record parsing)
+scores = store.query(columns=['motion', 'hand_visibility'])
+motion_scores = [s['motion'] for s in scores]
+hand_scores = [s['hand_visibility'] for s in scores]
 
 print(f"\nMotion scores:")
 print(f"  Mean: {np.mean(motion_scores):.3f}")
@@ -31,21 +33,33 @@ print(f"  Mean: {np.mean(hand_scores):.3f}")
 print(f"  Min: {np.min(hand_scores):.3f}")
 print(f"  Max: {np.max(hand_scores):.3f}")
 
-# Check clip shapes
-shapes = [c['shape'] for c in manifest]
+# Check clip shapes (one record is enough; every clip has the target resolution)
+shape = store.query(limit=1)[0]['shape']
 print(f"\nClip shapes (frames, height, width, channels):")
-print(f"  {shapes[0]}")
+print(f"  {shape}")
 
-# Check file sizes
+# Check file sizes (frames may be raw .npy or encoded video)
+frame_bytes = int(np.prod(shape[1:]))  # uint8
+clips = store.query(columns=['frames_path', 'frames_format', 'num_frames'])
 total_size = 0
-for c in manifest:
+raw_size = 0
+for c in clips:
     clip_path = c['frames_path']
-    if os.path.exists(clip_path):
+    arena_ref = split_arena_ref(clip_path)
+    if arena_ref is not None:
+        # Clip inside an arena file; its share is exactly the raw frames
+        if os.path.exists(arena_ref[0]):
+            total_size += c['num_frames'] * frame_bytes
+            raw_size += c['num_frames'] * frame_bytes
+    elif os.path.exists(clip_path):
         total_size += os.path.getsize(clip_path)
+        raw_size += c['num_frames'] * frame_bytes
 
-print(f"\nStorage:")
+formats = sorted({c['frames_format'] or 'npy' for c in clips})
+print(f"\nStorage ({', '.join(formats)}):")
 print(f"  Total: {total_size / 1e9:.2f} GB")
-print(f"  Per clip: {total_size / len(manifest) / 1e6:.1f} MB")
+print(f"  Per clip: {total_size / num_clips / 1e6:.1f} MB")
+print(f"  Raw frames: {raw_size / 1e9:.2f} GB ({raw_size / max(total_size, 1):.1f}x saved)")
 
 # Plot distributions
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
@@ -70,11 +84,12 @@ print(f"\n✓ Saved quality plots to data/quality_review.png")
 
 # Sample a few clips to verify
 print(f"\nSample clips:")
-for i in [0, 15, 30, 45, 59]:
-    c = manifest[i]
-    print(f"\nClip {i}:")
-    print(f"  Motion: {c['quality_scores']['motion']:.3f}")
-    print(f"  Hands: {c['quality_scores']['hand_visibility']:.3f}")
+samples = store.query(filters={'seq': ('in', [0, 15, 30, 45, 59])},
+                      columns=['seq', 'motion', 'hand_visibility', 'num_frames', 'duration'])
+for c in samples:
+    print(f"\nClip {c['seq']}:")
+    print(f"  Motion: {c['motion']:.3f}")
+    print(f"  Hands: {c['hand_visibility']:.3f}")
     print(f"  Frames: {c['num_frames']}")
     print(f"  Duration: {c['duration']:.1f}s")
 
@@ -4,17 +4,17 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import yaml
-import numpy as np
-import json
 from ego2robot.vision.videomae import VideoMAEEmbedder
+from ego2robot.data.storage import load_frames
+from ego2robot.data.manifest import open_manifest
 
 # Load config
 with open('config/default.yaml') as f:
     config = yaml.safe_load(f)
 
 # Load manifest
-with open('data/ego2robot_dataset/clips_manifest.json') as f:
-    manifest = json.load(f)
+store = open_manifest('data/ego2robot_dataset')
+manifest = store.records()
 
 print("Testing VideoMAE embeddings...")
 print(f"Total clips: {len(manifest)}")
@@ -27,7 +27,7 @@ for i in range(3):
     clip_meta = manifest[i]
     
     # Load frames
-    frames = np.load(clip_meta['frames_path'])
+    frames = load_frames(clip_meta['frames_path'])
     print(f"\nClip {i}:")
     print(f"  Shape: {frames.shape}")
     
@@ -5,17 +5,18 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import yaml
 import numpy as np
-import json
 from tqdm import tqdm
 from ego2robot.vision.videomae import VideoMAEEmbedder
+from ego2robot.data.storage import load_frames
+from ego2robot.data.manifest import open_manifest
 
 # Load config
 with open('config/default.yaml') as f:
     config = yaml.safe_load(f)
 
 # Load manifest
-with open('data/ego2robot_dataset/clips_manifest.json') as f:
-    manifest = json.load(f)
+store = open_manifest('data/ego2robot_dataset')
+manifest = store.records()
 
 print("="*60)
 print("EXTRACTING EMBEDDINGS FOR ALL CLIPS")
@@ -27,30 +28,24 @@ embedder = VideoMAEEmbedder(config)
 
 # Extract embeddings
 embeddings = []
-updated_manifest = []
 
 for i, clip_meta in enumerate(tqdm(manifest, desc="Extracting embeddings")):
     # Load frames
-    frames = np.load(clip_meta['frames_path'])
+    frames = load_frames(clip_meta['frames_path'])
     
     # Extract embedding
     embedding = embedder.embed_clip(frames)
     embeddings.append(embedding)
     
-    # Update metadata
-    clip_meta['embedding_path'] = clip_meta['frames_path'].replace('.npy', '_embedding.npy')
-    np.save(clip_meta['embedding_path'], embedding)
-    
-    updated_manifest.append(clip_meta)
+    # Update metadata (committed per clip, so an interrupted run keeps its progress)
+    embedding_path = os.path.join(os.path.dirname(clip_meta['frames_path']), f"{clip_meta['clip_id']}_embedding.npy")
+    np.save(embedding_path, embedding)
+    store.update(clip_meta['clip_id'], embedding_path=embedding_path)
 
 # Save embeddings as single file too
 embeddings_array = np.stack(embeddings)
 np.save('data/ego2robot_dataset/all_embeddings.npy', embeddings_array)
 
-# Update manifest
-with open('data/ego2robot_dataset/clips_manifest.json', 'w') as f:
-    json.dump(updated_manifest, f, indent=2)
-
 print("\n" + "="*60)
 print("EMBEDDINGS EXTRACTED")
 print("="*60)
@@ -0,0 +1,51 @@
+"""Simulate hand-visibility early stopping: MediaPipe calls saved and decisions changed."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from ego2robot.vision.hands import spread_order, visibility_decision
+
+CANDIDATES = 12  # every 3rd frame of a 6 s clip at 6 fps
+THRESHOLD = 0.3
+BATCH = 2
+TRIALS = 2000
+
+print("="*60)
+print("HAND EARLY-STOP SIMULATION")
+print("="*60)
+print(f"{CANDIDATES} candidate frames, threshold {THRESHOLD}, batches of {BATCH}")
+
+rng = np.random.default_rng(0)
+
+def simulate(mode, visible_frames):
+    """Hands appear in one contiguous run (a reach), placed at random."""
+    calls, wrong = [], 0
+    for _ in range(TRIALS):
+        truth = np.zeros(CANDIDATES, dtype=bool)
+        start = rng.integers(0, CANDIDATES - visible_frames + 1)
+        truth[start:start + visible_frames] = True
+
+        order = spread_order(CANDIDATES)
+        hits = seen = 0
+        decision = None
+        for i in range(0, CANDIDATES, BATCH):
+            batch = order[i:i + BATCH]
+            hits += truth[batch].sum()
+            seen += len(batch)
+            decision = visibility_decision(hits, seen, CANDIDATES, THRESHOLD, mode)
+            if decision is not None:
+                break
+
+        calls.append(seen)
+        wrong += decision != (visible_frames / CANDIDATES >= THRESHOLD)
+    return np.mean(calls), wrong / TRIALS
+
+print(f"\n{'frames w/ hands':>15} {'certain calls':>14} {'likely calls':>13} {'likely flips':>13}")
+for visible_frames in [0, 2, 3, 4, 6, 9, 12]:
+    certain_calls, _ = simulate('certain', visible_frames)
+    likely_calls, flips = simulate('likely', visible_frames)
+    print(f"{visible_frames:>15} {certain_calls:>14.1f} {likely_calls:>13.1f} {flips:>12.1%}")
+
+print(f"\n(without early stopping every clip costs {CANDIDATES} calls)")
+print("\n✓ Simulation complete")
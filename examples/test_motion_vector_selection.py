@@ -0,0 +1,80 @@
+"""motion.scorer 'mv' must reach the extractor and the quality stage, and fall back without PyAV."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+import io
+import cv2
+import numpy as np
+import yaml
+import ego2robot.vision.motion as motion
+from ego2robot.data.clips import ClipExtractor
+from ego2robot.data.quality import QualityFilter, motion_threshold
+from ego2robot.data.video_io import av
+
+if av is None:
+    print("PyAV not installed - pip install av")
+    sys.exit(1)
+
+# Load config
+with open('config/default.yaml') as f:
+    config = yaml.safe_load(f)
+
+FPS = 12
+SECONDS = 24
+H, W = config['processing']['target_resolution']
+
+
+def synthetic_video():
+    """H.264 video: still for 6 s, panning for 6 s, and again."""
+    rng = np.random.default_rng(0)
+    scene = cv2.GaussianBlur(rng.integers(0, 255, (H, W, 3), dtype=np.uint8), (0, 0), 3)
+    buffer = io.BytesIO()
+    with av.open(buffer, 'w', format='mp4') as container:
+        stream = container.add_stream('libx264', rate=FPS)
+        stream.width, stream.height, stream.pix_fmt = W, H, 'yuv420p'
+        for t in range(SECONDS * FPS):
+            frame = np.roll(scene, t * 24, axis=1) if (t // (6 * FPS)) % 2 else scene
+            for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format='bgr24')):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+video = synthetic_video()
+cfg = copy.deepcopy(config)
+cfg['motion']['scorer'] = 'mv'
+cfg['clips'].update(stride=6.0, segmentation='fixed')
+cfg['quality']['stages'] = [{'name': 'motion'}]
+threshold = cfg['motion']['mv_threshold']
+assert motion_threshold(cfg) == threshold
+
+for decode_mode in ['seek', 'sequential']:
+    cfg['processing']['decode_mode'] = decode_mode
+    extractor = ClipExtractor(cfg)
+    clips = extractor.extract_clips(video, {'factory_id': 'factory_test'})
+    starts = [clip['start_time'] for clip in clips]
+    print(f"{decode_mode}: kept {starts}, {extractor.stats['prescreened']} prescreened, "
+          f"scores {[round(clip['motion_score'], 3) for clip in clips]}")
+    assert starts == [6.0, 18.0], starts
+    assert extractor.stats['prescreened'] == 2
+    assert extractor.stats['windows'] == 2, "prescreened windows must not be decoded"
+    assert all(clip['motion_score'] >= threshold for clip in clips)
+
+    quality_filter = QualityFilter(cfg)
+    passed = quality_filter.filter_clips(clips)
+    assert len(passed) == 2
+    assert quality_filter.stages[0].threshold == threshold
+
+# Without PyAV the switch falls back to pixel motion and its threshold
+motion.av = None
+try:
+    extractor = ClipExtractor(cfg)
+    assert extractor.vector_scorer is None
+    assert extractor.min_motion == cfg['clips']['min_motion_score']
+finally:
+    motion.av = av
+
+print("\n✓ motion.scorer 'mv' selects vector scoring; falls back to pixel without PyAV")
@@ -16,6 +16,9 @@ setup(
         "pyyaml>=6.0",
         "tqdm>=4.65.0",
     ],
+    extras_require={
+        'pyav': ['av>=10.0.0'],
+    },
     entry_points={
         'console_scripts': [
             'ego2robot=ego2robot.cli:cli',